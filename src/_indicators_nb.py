@@ -0,0 +1,166 @@
+"""
+Numba Kernels for add_technical_indicators_batch
+Single-pass rolling loops over raw NumPy arrays, replacing the chain of
+pandas rolling/ewm calls in features.py.
+
+IMPORTANT: Semantics mirror the pandas path in features.add_technical_indicators_batch
+(full windows for rolling means/stds, NaN-aware, Wilder RSI via ewm(adjust=False)).
+Keep the two in lock-step.
+"""
+
+import numpy as np
+from _njit import njit
+from _wilder import WILDER_N
+
+
+@njit(cache=True)
+def rolling_mean_std(arr, window):
+    """Rolling mean and sample std (ddof=1) over full windows; NaN if the window has a NaN"""
+    n = arr.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    # Sums are taken around the first valid value to limit cancellation in the variance
+    shift = 0.0
+    for i in range(n):
+        if not np.isnan(arr[i]):
+            shift = arr[i]
+            break
+    s = 0.0
+    s2 = 0.0
+    n_nan = 0
+    for i in range(n):
+        x = arr[i]
+        if np.isnan(x):
+            n_nan += 1
+        else:
+            d = x - shift
+            s += d
+            s2 += d * d
+        if i >= window:
+            y = arr[i - window]
+            if np.isnan(y):
+                n_nan -= 1
+            else:
+                d = y - shift
+                s -= d
+                s2 -= d * d
+        if i >= window - 1 and n_nan == 0:
+            m = s / window
+            mean[i] = m + shift
+            var = (s2 - s * m) / (window - 1)
+            std[i] = np.sqrt(var) if var > 0 else 0.0
+    return mean, std
+
+
+@njit(cache=True)
+def rolling_quantile(arr, window, q, min_periods):
+    """Rolling quantile with linear interpolation over the non-NaN values in each window"""
+    n = arr.shape[0]
+    out = np.full(n, np.nan)
+    buf = np.empty(window)  # Sorted valid values of the current window
+    m = 0
+    for i in range(n):
+        # Drop the value leaving the window, then insert the new one keeping buf[:m] sorted
+        if i >= window:
+            y = arr[i - window]
+            if not np.isnan(y):
+                j = np.searchsorted(buf[:m], y)
+                buf[j:m - 1] = buf[j + 1:m].copy()
+                m -= 1
+        x = arr[i]
+        if not np.isnan(x):
+            j = np.searchsorted(buf[:m], x)
+            buf[j + 1:m + 1] = buf[j:m].copy()
+            buf[j] = x
+            m += 1
+        if m >= min_periods and m > 0:
+            pos = q * (m - 1)
+            lo = int(np.floor(pos))
+            hi = min(lo + 1, m - 1)
+            out[i] = buf[lo] + (buf[hi] - buf[lo]) * (pos - lo)
+    return out
+
+
+@njit(cache=True)
+def wilder_rsi(close, n=14):
+    """RSI with Wilder smoothing (ewm alpha=1/n, adjust=False, min_periods=n); 50 where undefined"""
+    size = close.shape[0]
+    out = np.full(size, 50.0)
+    alpha = 1.0 / n
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(size):
+        # First diff is NaN in pandas and becomes 0 in gain/loss
+        d = close[i] - close[i - 1] if i > 0 else 0.0
+        g = d if d > 0 else 0.0
+        l = -d if d < 0 else 0.0
+        if i == 0:
+            avg_gain = g
+            avg_loss = l
+        else:
+            avg_gain = (1.0 - alpha) * avg_gain + alpha * g
+            avg_loss = (1.0 - alpha) * avg_loss + alpha * l
+        if i >= n - 1 and avg_loss != 0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    return out
+
+
+@njit(cache=True)
+def _pct_change(close, periods):
+    out = np.full(close.shape[0], np.nan)
+    for i in range(periods, close.shape[0]):
+        out[i] = close[i] / close[i - periods] - 1.0
+    return out
+
+
+@njit(cache=True)
+def compute_all(close, high, low, volume, taker):
+    """
+    All add_technical_indicators_batch columns (except hour) in one call.
+    Returns a tuple in the order of INDICATOR_COLUMNS.
+    """
+    n = close.shape[0]
+    ma5, _ = rolling_mean_std(close, 5)
+    ma15, std15 = rolling_mean_std(close, 15)
+    ma30, _ = rolling_mean_std(close, 30)
+    _, std60 = rolling_mean_std(close, 60)
+    atr, _ = rolling_mean_std(high - low, 14)
+    vol_ma20, _ = rolling_mean_std(volume, 20)
+
+    ma_5_rel = (close - ma5) / ma5
+    ma_15_rel = (close - ma15) / ma15
+    ma_30_rel = (close - ma30) / ma30
+    return_5m = _pct_change(close, 5)
+    return_15m = _pct_change(close, 15)
+    vol_15 = std15 / close
+    vol_60 = std60 / close
+    atr_14 = atr / close
+
+    vol_75th = rolling_quantile(vol_15, 100, 0.75, 20)
+    high_vol_regime = np.zeros(n)
+    rsi_14 = wilder_rsi(close, WILDER_N)
+    vol_ratio = volume / vol_ma20
+    taker_ratio = np.empty(n)
+    momentum_confluence = np.empty(n)
+    for i in range(n):
+        if vol_15[i] > vol_75th[i]:
+            high_vol_regime[i] = 1.0
+        t = taker[i] / volume[i] if volume[i] != 0 else np.nan
+        taker_ratio[i] = 0.5 if np.isnan(t) else t
+        momentum_confluence[i] = (
+            (1.0 if return_5m[i] > 0 else 0.0) +
+            (1.0 if return_15m[i] > 0 else 0.0) +
+            (1.0 if ma_5_rel[i] > 0 else 0.0)
+        ) / 3
+
+    return (ma_5_rel, ma_15_rel, ma_30_rel, return_5m, return_15m,
+            vol_15, vol_60, atr_14, high_vol_regime, rsi_14,
+            vol_ratio, taker_ratio, momentum_confluence)
+
+
+# Column names for the compute_all outputs, in order
+INDICATOR_COLUMNS = (
+    'ma_5_rel', 'ma_15_rel', 'ma_30_rel', 'return_5m', 'return_15m',
+    'vol_15', 'vol_60', 'atr_14', 'high_vol_regime', 'rsi_14',
+    'vol_ratio', 'taker_ratio', 'momentum_confluence',
+)
@@ -0,0 +1,18 @@
+"""
+Optional Numba Support
+Exposes `njit` whether or not numba is installed. Without numba the
+decorator is a no-op and the wrapped functions run as plain Python,
+so callers should check HAS_NUMBA before relying on the speed.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
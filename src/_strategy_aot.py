@@ -0,0 +1,30 @@
+"""
+Ahead-of-Time Build for the Strategy Kernel
+Compiles strategy_numba's kernel into src/momentum_kernels*.so so the
+backtest doesn't pay the Numba JIT compile on a cold cache.
+
+Run once per machine / Python version (the .so is not committed):
+    python src/_strategy_aot.py
+strategy_numba falls back to @njit(cache=True) when the module is missing.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from numba.pycc import CC
+from strategy_numba import _signal_and_win_nb
+
+cc = CC('momentum_kernels')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+# One export per dtype combination the backtest uses:
+#   f4/u1 = downcast backtest columns, f8/i8 = add_outcomes defaults
+kernel = _signal_and_win_nb.py_func
+cc.export('signal_and_win_f4', 'UniTuple(i8, 2)(f4[::1], f4[::1], f4[::1], u1[::1], u1[::1])')(kernel)
+cc.export('signal_and_win_f8', 'UniTuple(i8, 2)(f8[::1], f8[::1], f8[::1], i8[::1], i8[::1])')(kernel)
+
+if __name__ == "__main__":
+    cc.compile()
+    print(f"✅ Built {cc.name} in {cc.output_dir}")
@@ -0,0 +1,8 @@
+"""
+Wilder Smoothing Constants
+Shared by every RSI implementation (pandas batch path, Numba kernels and
+the live LiveIndicatorStream) so they can't drift apart.
+"""
+
+WILDER_N = 14                # RSI-14
+WILDER_ALPHA = 1 / WILDER_N  # ewm(alpha=1/N, adjust=False) == Wilder's smoothing
@@ -5,97 +5,191 @@ Contains WebSocket client and Kalshi API wrapper
 
 import time
 import json
+import random
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import websocket
 import threading
+from collections import deque
+import ssl
+import certifi  # Installed with requests; gives a CA bundle even where the OS one is missing (macOS)
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # orjson parses market-data frames several times faster than the stdlib
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+
+try:
+    # Only needed for BinanceWSServer.run_async (asyncio mode)
+    from websockets.asyncio.client import connect as ws_connect
+except ImportError:
+    ws_connect = None
+
+try:
+    # Only needed for KalshiAPIAsync (concurrent fan-out from scripts)
+    import aiohttp
+except ImportError:
+    aiohttp = None
 
 
 class BinanceWSServer:
     """Kraken WebSocket Client (no geo-restrictions, works globally)"""
     
-    def __init__(self, symbol="XBT/USD", verify_ssl=False):
+    PING_INTERVAL = 20  # Seconds between Kraken {"event": "ping"} messages
+    
+    def __init__(self, symbol="XBT/USD", verify_ssl=True):
         # Kraken WebSocket - no geographic restrictions
         self.url = "wss://ws.kraken.com"
         self.symbol = symbol
-        self.current_candle = None
         self.last_update = 0
         self.last_heartbeat = 0
         self.ws = None
+        self._aws = None  # Connection used by run_async()
         self.is_running = False
         self.verify_ssl = verify_ssl
+        # One SSL context for the lifetime of the client: reconnects can resume
+        # the TLS session instead of doing a full handshake each time.
+        if verify_ssl:
+            self._ssl_ctx = ssl.create_default_context(cafile=certifi.where())
+        else:
+            self._ssl_ctx = ssl._create_unverified_context()
         self.reconnect_count = 0
+        self._reconnect_attempts = 0  # Consecutive failures, reset once subscribed
         self.subscribed = False
         
-        # Track OHLCV for the current minute
-        self._current_minute = None
+        # Subscribe message, serialized once and re-sent on every reconnect
+        self._sub_bytes = _json_dumps({
+            "event": "subscribe",
+            "pair": [symbol],
+            "subscription": {"name": "trade"}
+        })
+        
+        # Application-level keepalive (see _send_ping)
+        self._ping_bytes = _json_dumps({"event": "ping"})
+        self._ping_timer = None
+        
+        # Track OHLCV for the current minute (only the WS thread touches these)
+        self._current_minute = None  # Epoch seconds of the minute bucket
+        self._minute_ts = None       # Same bucket as a pd.Timestamp (built once per minute)
         self._minute_open = None
         self._minute_high = None
         self._minute_low = None
+        self._minute_close = None
         self._minute_volume = 0
         self._taker_buy_volume = 0
         
+        # What other threads read. The WS thread publishes the in-progress minute
+        # as one tuple per trade frame (a single assignment, so readers always
+        # see a consistent candle) and queues every closed minute; deque
+        # append/popleft are thread-safe, and a slow reader gets a backlog
+        # instead of losing bars.
+        self._snapshot = None
+        self._closed_candles = deque(maxlen=1440)  # A day of minutes
+        
     def on_message(self, ws, message):
-        data = json.loads(message)
+        data = _json_loads(message)
         self.last_update = time.time()
         
+        # Trade data comes as array: [channelID, [[price, volume, time, side, orderType, misc], ...], channelName, pair]
+        # This is by far the most common frame, so check it first.
+        if type(data) is list:
+            if len(data) < 4 or data[2] != 'trade':
+                return
+            for trade in data[1]:
+                price = float(trade[0])
+                qty = float(trade[1])
+                side = trade[3]  # 'b' = buy, 's' = sell
+                
+                # Bucket by integer epoch-minute (much cheaper than a pandas Timestamp per trade)
+                ts = int(float(trade[2]))
+                current_minute = ts - (ts % 60)
+                
+                # New minute started
+                if current_minute != self._current_minute:
+                    if self._current_minute is not None:
+                        if self._minute_open is not None:
+                            self._closed_candles.append(self._candle_dict(self._state_tuple(), is_closed=True))
+                        self._minute_open = price
+                        self._minute_high = price
+                        self._minute_low = price
+                        self._minute_volume = 0
+                        self._taker_buy_volume = 0
+                    self._current_minute = current_minute
+                    self._minute_ts = pd.Timestamp(current_minute, unit='s')
+                
+                if self._minute_open is None:
+                    self._minute_open = price
+                    self._minute_high = price
+                    self._minute_low = price
+                
+                self._minute_high = max(self._minute_high, price)
+                self._minute_low = min(self._minute_low, price)
+                self._minute_volume += qty
+                if side == 'b':  # Taker is buying
+                    self._taker_buy_volume += qty
+                self._minute_close = price
+            if self._minute_close is not None:
+                self._snapshot = self._state_tuple()
+            return
+        
         # Handle subscription confirmation
-        if isinstance(data, dict):
+        if type(data) is dict:
             if data.get('event') == 'subscriptionStatus':
                 if data.get('status') == 'subscribed':
                     self.subscribed = True
+                    self._reconnect_attempts = 0
                     print(f"✅ Subscribed to {data.get('pair')}")
                 return
-            if data.get('event') in ['heartbeat', 'systemStatus']:
+            if data.get('event') in ['heartbeat', 'systemStatus', 'pong']:
                 self.last_heartbeat = time.time()
                 return
-        
-        # Trade data comes as array: [channelID, [[price, volume, time, side, orderType, misc], ...], channelName, pair]
-        if isinstance(data, list) and len(data) >= 4:
-            channel_name = data[2] if len(data) > 2 else None
-            if channel_name == 'trade':
-                trades = data[1]
-                for trade in trades:
-                    price = float(trade[0])
-                    qty = float(trade[1])
-                    trade_time = pd.to_datetime(float(trade[2]), unit='s')
-                    side = trade[3]  # 'b' = buy, 's' = sell
-                    
-                    current_minute = trade_time.floor('min')
-                    
-                    # New minute started
-                    if self._current_minute is not None and current_minute != self._current_minute:
-                        if self.current_candle:
-                            self.current_candle['is_closed'] = True
-                        self._minute_open = price
-                        self._minute_high = price
-                        self._minute_low = price
-                        self._minute_volume = 0
-                        self._taker_buy_volume = 0
-                    
-                    self._current_minute = current_minute
-                    
-                    if self._minute_open is None:
-                        self._minute_open = price
-                        self._minute_high = price
-                        self._minute_low = price
-                    
-                    self._minute_high = max(self._minute_high, price)
-                    self._minute_low = min(self._minute_low, price)
-                    self._minute_volume += qty
-                    if side == 'b':  # Taker is buying
-                        self._taker_buy_volume += qty
-                    
-                    self.current_candle = {
-                        'timestamp': self._current_minute,
-                        'open': self._minute_open,
-                        'high': self._minute_high,
-                        'low': self._minute_low,
-                        'close': price,
-                        'volume': self._minute_volume,
-                        'taker_buy_base': self._taker_buy_volume,
-                        'is_closed': False
-                    }
+    
+    def _state_tuple(self):
+        return (self._minute_ts, self._minute_open, self._minute_high, self._minute_low,
+                self._minute_close, self._minute_volume, self._taker_buy_volume)
+    
+    @staticmethod
+    def _candle_dict(state, is_closed=False):
+        ts, o, h, l, c, vol, taker = state
+        return {
+            'timestamp': ts,
+            'open': o,
+            'high': h,
+            'low': l,
+            'close': c,
+            'volume': vol,
+            'taker_buy_base': taker,
+            'is_closed': is_closed
+        }
+    
+    def get_current_candle(self):
+        """
+        Snapshot of the in-progress minute as a dict (None before the first trade).
+        Built on demand from the last published tuple, so the WS thread doesn't
+        allocate a dict per trade.
+        """
+        snapshot = self._snapshot  # Read once: a consistent candle even mid-update
+        if snapshot is None:
+            return None
+        return self._candle_dict(snapshot)
+    
+    # Backwards-compatible attribute access
+    current_candle = property(get_current_candle)
+    
+    def pop_closed_candle(self):
+        """Return the oldest closed minute not yet consumed (None if there is none)"""
+        try:
+            return self._closed_candles.popleft()
+        except IndexError:
+            return None
     
     def on_ping(self, ws, message):
         self.last_heartbeat = time.time()
@@ -107,6 +201,8 @@ class BinanceWSServer:
         print(f"\n⚠️ WS Error: {error}")
         
     def on_close(self, ws, close_status_code, close_msg):
+        if self._ping_timer:
+            self._ping_timer.cancel()
         print(f"\n🔌 WS Closed (code={close_status_code})")
         
     def on_open(self, ws):
@@ -114,16 +210,34 @@ class BinanceWSServer:
         print(f"\n✅ WS Connected to Kraken (attempt #{self.reconnect_count})")
         
         # Subscribe to BTC/USD trades
-        subscribe_msg = {
-            "event": "subscribe",
-            "pair": [self.symbol],
-            "subscription": {"name": "trade"}
-        }
-        ws.send(json.dumps(subscribe_msg))
+        ws.send(self._sub_bytes)
         print(f"📡 Subscribing to {self.symbol} trades...")
+        self._schedule_ping(ws)
+    
+    def _schedule_ping(self, ws):
+        self._ping_timer = threading.Timer(self.PING_INTERVAL, self._send_ping, args=(ws,))
+        self._ping_timer.daemon = True
+        self._ping_timer.start()
+    
+    def _send_ping(self, ws):
+        """
+        Kraken application-level ping. The 'pong' reply proves the subscription
+        itself is alive, not just the TCP socket (unlike RFC6455 control pings).
+        """
+        if not self.is_running or ws is not self.ws:
+            return
+        try:
+            ws.send(self._ping_bytes)
+        except Exception:
+            return  # Connection is gone; _run() handles the reconnect
+        self._schedule_ping(ws)
+    
+    def _next_reconnect_delay(self):
+        # Capped exponential backoff + jitter: fast first retry, no retry storms
+        self._reconnect_attempts += 1
+        return min(30, 0.25 * 2 ** min(self._reconnect_attempts, 7)) + random.uniform(0, 0.5)
         
     def _run(self):
-        import ssl
         while self.is_running:
             try:
                 self.ws = websocket.WebSocketApp(
@@ -135,14 +249,65 @@ class BinanceWSServer:
                     on_ping=self.on_ping,
                     on_pong=self.on_pong
                 )
-                ssl_opts = {} if self.verify_ssl else {"cert_reqs": ssl.CERT_NONE}
-                self.ws.run_forever(sslopt=ssl_opts, ping_interval=20, ping_timeout=10)
+                # No control-frame pings: liveness comes from Kraken's ping/pong + heartbeats
+                self.ws.run_forever(sslopt={"context": self._ssl_ctx}, ping_interval=0)
+            except Exception as e:
+                print(f"\n⚠️ WS Exception: {e}")
+            
+            if self.is_running:
+                delay = self._next_reconnect_delay()
+                print(f"🔄 WS reconnecting in {delay:.1f}s...")
+                time.sleep(delay)
+    
+    async def run_async(self):
+        """
+        asyncio alternative to start(): runs the same feed as a task on the
+        caller's event loop instead of a dedicated thread, so it can share a
+        loop with KalshiAPIAsync. Cancel the task (or call stop()) to end it.
+        
+            feed = asyncio.create_task(ws.run_async())
+        """
+        if ws_connect is None:
+            raise ImportError("run_async requires websockets>=13 (pip install websockets)")
+        ssl_ctx = self._ssl_ctx if self.url.startswith('wss://') else None
+        
+        self.is_running = True
+        self.last_heartbeat = time.time()
+        while self.is_running:
+            try:
+                async with ws_connect(self.url, ssl=ssl_ctx, ping_interval=None) as ws:
+                    self._aws = ws
+                    self.reconnect_count += 1
+                    print(f"\n✅ WS Connected to Kraken (attempt #{self.reconnect_count})")
+                    await ws.send(self._sub_bytes.decode())  # str -> text frame
+                    print(f"📡 Subscribing to {self.symbol} trades...")
+                    pinger = asyncio.create_task(self._ping_loop_async(ws))
+                    try:
+                        async for message in ws:
+                            self.on_message(ws, message)
+                            if not self.is_running:
+                                break
+                    finally:
+                        pinger.cancel()
+                print("\n🔌 WS Closed")
             except Exception as e:
                 print(f"\n⚠️ WS Exception: {e}")
+            finally:
+                self._aws = None
             
             if self.is_running:
-                print("🔄 WS reconnecting in 2s...")
-                time.sleep(2)
+                delay = self._next_reconnect_delay()
+                print(f"🔄 WS reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+    
+    async def _ping_loop_async(self, ws):
+        ping_text = self._ping_bytes.decode()
+        try:
+            while True:
+                await asyncio.sleep(self.PING_INTERVAL)
+                await ws.send(ping_text)
+        except Exception:
+            return  # Connection is gone; run_async() handles the reconnect
     
     def force_reconnect(self):
         """Force reconnection when stale"""
@@ -152,6 +317,9 @@ class BinanceWSServer:
                 self.ws.close()
             except:
                 pass
+        if self._aws is not None:
+            # run_async mode: must be called from the event loop's thread
+            asyncio.ensure_future(self._aws.close())
         
     def start(self):
         if self.is_running: return
@@ -174,32 +342,75 @@ class KalshiAPI:
         self.BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
         # OPTIMIZATION: Reuse connections via Session
         self.session = requests.Session()
+        # Larger keep-alive pool + light retries on transient errors / rate limits
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.1, status_forcelist=[429, 502, 503, 504],
+                              raise_on_status=False)  # Hand the last response back to our status checks
+        )
+        self.session.mount('https://', adapter)
     
-    def get_markets(self, series_ticker="KXBTC15M"):
+    def get_markets(self, series_ticker="KXBTC15M", status="open"):
         url = f"{self.BASE_URL}/markets"
         # Increased limit to 1000 to catch ALL markets in the series.
         # This prevents buried active markets from being missed.
+        # Filter by status server-side so we only download tradable markets.
         params = {"series_ticker": series_ticker, "limit": 1000}
-        resp = self.session.get(url, params=params, timeout=10)
-        if resp.status_code != 200:
-            print(f"⚠️ API Error (get_markets): {resp.status_code} {resp.text}")
-            return []
+        if status:
+            params["status"] = status
+        
+        markets = []
+        while True:
+            resp = self.session.get(url, params=params, timeout=10)
+            if resp.status_code != 200:
+                print(f"⚠️ API Error (get_markets): {resp.status_code} {resp.text}")
+                return markets
+            data = _json_loads(resp.content)
+            page = data.get('markets', [])
+            markets.extend(page)
+            
+            # Follow the cursor if there are more than `limit` matches
+            cursor = data.get('cursor')
+            if not cursor or len(page) < params["limit"]:
+                break
+            params["cursor"] = cursor
         
         # Return all markets from the series, let the evaluator filter further
-        return resp.json().get('markets', [])
+        return markets
     
     def get_orderbook(self, ticker):
         url = f"{self.BASE_URL}/markets/{ticker}/orderbook"
         resp = self.session.get(url, timeout=5)
-        return resp.json().get('orderbook', {}) if resp.status_code == 200 else None
+        return _json_loads(resp.content).get('orderbook', {}) if resp.status_code == 200 else None
+    
+    def get_orderbooks(self, tickers):
+        """
+        Fetch several orderbooks in parallel over the shared (pooled) session.
+        Returns {ticker: orderbook or None}
+        """
+        tickers = list(tickers)
+        if not tickers:
+            return {}
+
+        def fetch(ticker):
+            # One timeout or bad payload must not drop the whole batch
+            try:
+                return self.get_orderbook(ticker)
+            except Exception as e:
+                print(f"⚠️ API Exception (get_orderbook {ticker}): {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as ex:
+            return dict(zip(tickers, ex.map(fetch, tickers)))
 
     def get_market_result(self, ticker):
         """Fetch result for a settled market"""
         url = f"{self.BASE_URL}/markets/{ticker}"
         try:
-            resp = requests.get(url, timeout=10)
+            resp = self.session.get(url, timeout=10)
             if resp.status_code == 200:
-                market = resp.json().get('market', {})
+                market = _json_loads(resp.content).get('market', {})
                 status = market.get('status')
                 if status == 'finalized':
                     return market.get('result')
@@ -209,3 +420,80 @@ class KalshiAPI:
         except Exception as e:
             print(f"⚠️ API Exception (get_market_result): {e}")
         return None
+
+
+class KalshiAPIAsync:
+    """
+    asyncio/aiohttp version of KalshiAPI for concurrent requests.
+    Use it when many markets must be fetched at once, e.g. all open
+    orderbooks: N requests complete in about one round trip instead of N.
+    
+        async with KalshiAPIAsync() as api:
+            books = await api.get_orderbooks(tickers)
+    """
+    
+    def __init__(self):
+        if aiohttp is None:
+            raise ImportError("KalshiAPIAsync requires aiohttp (pip install aiohttp)")
+        self.BASE_URL = "https://api.elections.kalshi.com/trade-api/v2"
+        self.session = None  # Created lazily inside the running event loop
+    
+    async def __aenter__(self):
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self.session
+    
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def _get_json(self, url, **kwargs):
+        async with self._get_session().get(url, **kwargs) as resp:
+            if resp.status != 200:
+                print(f"⚠️ API Error ({url}): {resp.status} {await resp.text()}")
+                return None
+            return await resp.json(loads=_json_loads)
+    
+    async def get_markets(self, series_ticker="KXBTC15M", status="open"):
+        params = {"series_ticker": series_ticker, "limit": 1000}
+        if status:
+            params["status"] = status
+        
+        markets = []
+        while True:
+            data = await self._get_json(f"{self.BASE_URL}/markets", params=params)
+            if not data:
+                return markets
+            page = data.get('markets', [])
+            markets.extend(page)
+            cursor = data.get('cursor')
+            if not cursor or len(page) < params["limit"]:
+                break
+            params["cursor"] = cursor
+        return markets
+    
+    async def get_orderbook(self, ticker):
+        data = await self._get_json(f"{self.BASE_URL}/markets/{ticker}/orderbook")
+        return data.get('orderbook', {}) if data is not None else None
+    
+    async def get_orderbooks(self, tickers):
+        """Fetch several orderbooks concurrently. Returns {ticker: orderbook or None}"""
+        books = await asyncio.gather(*[self.get_orderbook(t) for t in tickers], return_exceptions=True)
+        result = {}
+        for ticker, book in zip(tickers, books):
+            if isinstance(book, Exception):
+                print(f"⚠️ API Exception (get_orderbook {ticker}): {book}")
+                book = None
+            result[ticker] = book
+        return result
@@ -5,10 +5,82 @@ Tests simple heuristic rules for consistent win-rate trading on KXBTC15M
 
 import pandas as pd
 import numpy as np
+import os
+import glob
+import hashlib
 import sys
 sys.path.insert(0, 'src')
-from features import add_technical_indicators
-from strategy import get_signal
+from features import add_technical_indicators_batch
+from collector import load_candles, DATA_CSV, DATA_PARQUET
+from strategy_numba import signal_and_win
+
+# Sources that determine the enriched columns (values, dtypes, formulas)
+INDICATOR_SOURCES = ('features.py', '_indicators_nb.py', '_wilder.py')
+
+def indicator_code_tag():
+    """Short hash of the indicator sources: any change to them invalidates the enriched cache"""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha1()
+    for name in INDICATOR_SOURCES:
+        with open(os.path.join(src_dir, name), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+def load_enriched_candles():
+    """
+    Full candle history with technical indicators already added.
+    The result is cached as Feather, keyed by the input file's mtime and by
+    a hash of the indicator code, so repeated runs (e.g. different --hours
+    windows) skip the rolling computations entirely, while a cache built by
+    older indicator code is never reused.
+    """
+    inputs = [p for p in (DATA_CSV, DATA_PARQUET) if os.path.exists(p)]
+    input_mtime = int(max(os.path.getmtime(p) for p in inputs)) if inputs else 0
+    cache_path = f"data/btc_enriched_{input_mtime}_{indicator_code_tag()}.feather"
+    
+    try:
+        if os.path.exists(cache_path):
+            return pd.read_feather(cache_path).set_index('timestamp')
+        
+        df = add_technical_indicators_batch(load_candles()).dropna()
+        df.index.name = 'timestamp'
+        df.reset_index().to_feather(cache_path)
+        
+        # Only the newest cache is ever used
+        for old in glob.glob("data/btc_enriched_*.feather"):
+            if old != cache_path:
+                os.remove(old)
+        return df
+    except ImportError:
+        return add_technical_indicators_batch(load_candles()).dropna()
+
+def add_outcomes(df):
+    """
+    Add 15-minute settlement outcomes (won_yes / won_no) to an indicator DataFrame.
+    Rows without a 15 min lookahead are dropped.
+    """
+    df = df.copy()
+    df['future_close'] = df['close'].shift(-15)
+    df['won_yes'] = (df['future_close'] > df['close']).astype(int)  # BTC went up
+    df['won_no'] = (df['future_close'] <= df['close']).astype(int)  # BTC went down or flat
+    return df.dropna()
+
+def threshold_sweep(values, thresholds, outcome, above=True, base_mask=None):
+    """
+    Evaluate `values > t` (or `values < t`) for every threshold in one broadcast.
+    Builds a (K, N) boolean matrix instead of K separate column scans.
+    Returns (totals, wins) as int arrays of length K.
+    """
+    thresholds = np.asarray(thresholds, dtype=values.dtype)  # Compare without upcasting the column
+    if above:
+        masks = values[None, :] > thresholds[:, None]
+    else:
+        masks = values[None, :] < thresholds[:, None]
+    if base_mask is not None:
+        masks &= base_mask
+    totals = np.count_nonzero(masks, axis=1)
+    wins = np.count_nonzero(masks & outcome, axis=1)
+    return totals, wins
 
 def test_momentum_strategies(df):
     """Test various momentum rules and report win rates"""
@@ -16,12 +88,21 @@ def test_momentum_strategies(df):
     results = []
     
     # Prepare data - we need 15 min lookahead for settlement
-    df = df.copy()
-    df['future_close'] = df['close'].shift(-15)
-    df['won_yes'] = (df['future_close'] > df['close']).astype(int)  # BTC went up
-    df['won_no'] = (df['future_close'] <= df['close']).astype(int)  # BTC went down or flat
-    df = df.dropna()
-    
+    if 'won_yes' not in df.columns:
+        df = add_outcomes(df)
+
+    # Pull the columns out as raw NumPy arrays once. Every strategy below
+    # is just a boolean mask + a sum, so skipping pandas label indexing
+    # (df.loc[mask, col]) avoids re-scanning the frame for each threshold.
+    r5, r15, rsi, vol15, tr, wy, wn = (df[c].to_numpy() for c in [
+        'return_5m', 'return_15m', 'rsi_14', 'vol_15', 'taker_ratio', 'won_yes', 'won_no'
+    ])
+    vol_ratio, ma5, ma15, ma30 = (df[c].to_numpy() for c in [
+        'vol_ratio', 'ma_5_rel', 'ma_15_rel', 'ma_30_rel'
+    ])
+    wyb, wnb = wy.astype(bool), wn.astype(bool)
+    buf = np.empty(len(df), dtype=bool)  # Reused scratch buffer for combined masks
+
     print("="*70)
     print("MOMENTUM STRATEGY BACKTEST")
     print("="*70)
@@ -33,28 +114,10 @@ def test_momentum_strategies(df):
     print("STRATEGY 0: CURRENT BOT CONFIGURATION (Exact Match)")
     print("-"*50)
     
-    # We'll apply the exact get_signal logic to every row
-    # This is slower but guarantees 100% logic match
-    bot_wins = 0
-    bot_trades = 0
-    
-    for idx, row in df.iterrows():
-        # Construct simplified indicators dict
-        indicators = {
-            'rsi_14': row['rsi_14'],
-            'return_15m': row['return_15m'],
-            'return_5m': row['return_5m']
-        }
-        
-        signal = get_signal(indicators)
-        if signal:
-            direction, name, _ = signal
-            bot_trades += 1
-            if direction == 'NO':
-                if row['won_no']: bot_wins += 1
-            else:
-                if row['won_yes']: bot_wins += 1
-                
+    # Apply the shared get_signal rules to every row in one native pass
+    # (signal_and_win mirrors get_signal exactly)
+    bot_trades, bot_wins = signal_and_win(rsi, r15, r5, wy, wn)
+
     if bot_trades > 0:
         wr = bot_wins / bot_trades * 100
         print(f"  Exact Bot Logic: {bot_wins}/{bot_trades} trades = {wr:.1f}% Win Rate")
@@ -68,13 +131,15 @@ def test_momentum_strategies(df):
     # ============================================================
     print("STRATEGY 1: Momentum Continuation")
     print("-"*50)
+
+    thresholds = np.array([0.002, 0.003, 0.004, 0.005])
+    up_totals, up_wins = threshold_sweep(r5, thresholds, wyb, above=True)
+    down_totals, down_wins = threshold_sweep(r5, -thresholds, wnb, above=False)
     
-    for threshold in [0.002, 0.003, 0.004, 0.005]:
+    for i, threshold in enumerate(thresholds):
         # Bet YES when recent momentum is positive
-        mask_yes = df['return_5m'] > threshold
-        if mask_yes.sum() > 0:
-            wins = df.loc[mask_yes, 'won_yes'].sum()
-            total = mask_yes.sum()
+        total, wins = int(up_totals[i]), int(up_wins[i])
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'Momentum UP > {threshold*100:.1f}%',
@@ -84,12 +149,10 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  5m return > {threshold*100:.2f}% → Bet YES: {wins}/{total} = {wr:.1f}% win rate")
-        
+
         # Bet NO when recent momentum is negative
-        mask_no = df['return_5m'] < -threshold
-        if mask_no.sum() > 0:
-            wins = df.loc[mask_no, 'won_no'].sum()
-            total = mask_no.sum()
+        total, wins = int(down_totals[i]), int(down_wins[i])
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'Momentum DOWN < -{threshold*100:.1f}%',
@@ -99,21 +162,20 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  5m return < -{threshold*100:.2f}% → Bet NO:  {wins}/{total} = {wr:.1f}% win rate")
-    
+
     print()
-    
+
     # ============================================================
     # STRATEGY 2: Mean Reversion After Extreme Moves
     # ============================================================
     print("STRATEGY 2:    # Reversion after large move (Mean Reversion)")
     print("    # ------------------------------------------------------------")
-    
+
     # Drop logic (Bet YES)
-    for threshold in [0.003, 0.004, 0.005, 0.006, 0.008]: # Added 0.003 (Aggressive)
-        mask = df['return_15m'] < -threshold
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_yes'].sum()
-            total = mask.sum()
+    thresholds = np.array([0.003, 0.004, 0.005, 0.006, 0.008]) # Added 0.003 (Aggressive)
+    totals, wins_k = threshold_sweep(r15, -thresholds, wyb, above=False)
+    for threshold, total, wins in zip(thresholds, totals.tolist(), wins_k.tolist()):
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'Reversion after DOWN < -{threshold*100:.1f}%',
@@ -125,11 +187,10 @@ def test_momentum_strategies(df):
             print(f"  15m return < -{threshold*100:.2f}% → Bet YES (reversal): {wins}/{total} = {wr:.1f}% win rate")
 
     # Spike logic (Bet NO)
-    for threshold in [0.004, 0.005, 0.006, 0.008]: # Added 0.008 (Turbo Mode)
-        mask = df['return_15m'] > threshold
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_no'].sum()
-            total = mask.sum()
+    thresholds = np.array([0.004, 0.005, 0.006, 0.008]) # Added 0.008 (Turbo Mode)
+    totals, wins_k = threshold_sweep(r15, thresholds, wnb, above=True)
+    for threshold, total, wins in zip(thresholds, totals.tolist(), wins_k.tolist()):
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'Reversion after UP > {threshold*100:.1f}%',
@@ -139,21 +200,23 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  15m return > {threshold*100:.2f}% → Bet NO (reversal): {wins}/{total} = {wr:.1f}% win rate")
-    
+
     print()
-    
+
     # ============================================================
     # STRATEGY 3: RSI Extreme Zones
     # ============================================================
     print("STRATEGY 3: RSI Extremes")
     print("-"*50)
+
+    rsi_lows, rsi_highs = [20, 25, 30], [80, 75, 70]
+    low_totals, low_wins = threshold_sweep(rsi, rsi_lows, wyb, above=False)
+    high_totals, high_wins = threshold_sweep(rsi, rsi_highs, wnb, above=True)
     
-    for rsi_low, rsi_high in [(20, 80), (25, 75), (30, 70)]:
+    for i, (rsi_low, rsi_high) in enumerate(zip(rsi_lows, rsi_highs)):
         # Oversold - bet YES (expect bounce)
-        mask = df['rsi_14'] < rsi_low
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_yes'].sum()
-            total = mask.sum()
+        total, wins = int(low_totals[i]), int(low_wins[i])
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'RSI < {rsi_low}',
@@ -163,25 +226,23 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  RSI < {rsi_low} → Bet YES (oversold bounce): {wins}/{total} = {wr:.1f}% win rate")
-        
+
         # Overbought - bet NO (expect pullback)
-        mask = df['rsi_14'] > rsi_high
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_no'].sum()
-            total = mask.sum()
+        total, wins = int(high_totals[i]), int(high_wins[i])
+        if total > 0:
             wr = wins / total * 100
             print(f"  RSI > {rsi_high} → Bet NO (overbought pullback): {wins}/{total} = {wr:.1f}% win rate")
 
     print()
     print("STRATEGY 3B: RSI + Momentum Confirmation (Refined)")
     print("-"*50)
-    
-    for rsi_val in [65, 70, 75, 80]:
-        # RSI strict + 5m downturn (Matched to Bot: Any red candle < 0)
-        mask = (df['rsi_14'] > rsi_val) & (df['return_5m'] < 0) 
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_no'].sum()
-            total = mask.sum()
+
+    red_5m = r5 < 0  # Shared by every RSI level below
+    rsi_vals = [65, 70, 75, 80]
+    # RSI strict + 5m downturn (Matched to Bot: Any red candle < 0)
+    totals, wins_k = threshold_sweep(rsi, rsi_vals, wnb, above=True, base_mask=red_5m)
+    for rsi_val, total, wins in zip(rsi_vals, totals.tolist(), wins_k.tolist()):
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'RSI > {rsi_val} + 5m Dip',
@@ -191,12 +252,12 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  RSI > {rsi_val} + 5m Dip (< -0.1%) → Bet NO: {wins}/{total} = {wr:.1f}% win rate")
-            
+
     # Extreme RSI (No Confirmation)
-    mask = df['rsi_14'] > 80
-    if mask.sum() > 0:
-        wins = df.loc[mask, 'won_no'].sum()
-        total = mask.sum()
+    mask = rsi > 80
+    total = int(mask.sum())
+    if total > 0:
+        wins = int(wn[mask].sum())
         wr = wins / total * 100
         results.append({
             'strategy': 'RSI > 80 (No Conf)',
@@ -206,24 +267,25 @@ def test_momentum_strategies(df):
             'win_rate': wr
         })
         print(f"  RSI > 80 (No Confirmation) → Bet NO: {wins}/{total} = {wr:.1f}% win rate")
-    
+
     print()
-    
+
     # ============================================================
     # STRATEGY 4: Low Volatility + Trend
     # ============================================================
     print("STRATEGY 4: Low Volatility + Micro-Trend")
     print("-"*50)
-    
-    vol_25th = df['vol_15'].quantile(0.25)
-    low_vol_mask = df['vol_15'] < vol_25th
-    
+
+    vol_25th = np.quantile(vol15, 0.25)
+    # Only ~25% of rows are low-vol: gather them once and sweep just that subset
+    lv_idx = np.flatnonzero(vol15 < vol_25th)
+    r5_lv, wyb_lv = r5[lv_idx], wyb[lv_idx]
+
     # In low vol, bet with micro-trend
-    for threshold in [0.001, 0.0015, 0.002]:
-        mask = low_vol_mask & (df['return_5m'] > threshold)
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_yes'].sum()
-            total = mask.sum()
+    thresholds = np.array([0.001, 0.0015, 0.002])
+    totals, wins_k = threshold_sweep(r5_lv, thresholds, wyb_lv, above=True)
+    for threshold, total, wins in zip(thresholds, totals.tolist(), wins_k.tolist()):
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'LowVol + Up > {threshold*100:.2f}%',
@@ -233,61 +295,60 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  Low vol + 5m up > {threshold*100:.2f}% → Bet YES: {wins}/{total} = {wr:.1f}% win rate")
-        
+
     print("STRATEGY 5: ALWAYS ACTIVE (Market Making)")
     print("-"*50)
-    
+
+    up_15m = r15 > 0
+    down_15m = r15 < 0
+    up_total = int(up_15m.sum())
+    down_total = int(down_15m.sum())
+
     # Always Fade (Bet Against 15m Move)
     # If 15m is Green (>0), Bet NO.
-    mask = df['return_15m'] > 0
-    if mask.sum() > 0:
-        wins = df.loc[mask, 'won_no'].sum()
-        total = mask.sum()
-        wr = wins / total * 100
-        print(f"  ALWAYS FADE (Up -> NO): {wins}/{total} = {wr:.1f}% win rate")
-        
+    if up_total > 0:
+        wins = int(wn[up_15m].sum())
+        wr = wins / up_total * 100
+        print(f"  ALWAYS FADE (Up -> NO): {wins}/{up_total} = {wr:.1f}% win rate")
+
     # If 15m is Red (<0), Bet YES.
-    mask = df['return_15m'] < 0
-    if mask.sum() > 0:
-        wins = df.loc[mask, 'won_yes'].sum()
-        total = mask.sum()
-        wr = wins / total * 100
-        print(f"  ALWAYS FADE (Down -> YES): {wins}/{total} = {wr:.1f}% win rate")
-    
+    if down_total > 0:
+        wins = int(wy[down_15m].sum())
+        wr = wins / down_total * 100
+        print(f"  ALWAYS FADE (Down -> YES): {wins}/{down_total} = {wr:.1f}% win rate")
+
     print()
-    
+
     # Always Follow (Trend Following)
     # If 15m is Green (>0), Bet YES.
-    mask = df['return_15m'] > 0
-    if mask.sum() > 0:
-        wins = df.loc[mask, 'won_yes'].sum()
-        total = mask.sum()
-        wr = wins / total * 100
-        print(f"  ALWAYS FOLLOW (Up -> YES): {wins}/{total} = {wr:.1f}% win rate")
-        
+    if up_total > 0:
+        wins = int(wy[up_15m].sum())
+        wr = wins / up_total * 100
+        print(f"  ALWAYS FOLLOW (Up -> YES): {wins}/{up_total} = {wr:.1f}% win rate")
+
     # If 15m is Red (<0), Bet NO.
-    mask = df['return_15m'] < 0
-    if mask.sum() > 0:
-        wins = df.loc[mask, 'won_no'].sum()
-        total = mask.sum()
-        wr = wins / total * 100
-        print(f"  ALWAYS FOLLOW (Down -> NO): {wins}/{total} = {wr:.1f}% win rate")
+    if down_total > 0:
+        wins = int(wn[down_15m].sum())
+        wr = wins / down_total * 100
+        print(f"  ALWAYS FOLLOW (Down -> NO): {wins}/{down_total} = {wr:.1f}% win rate")
+
 
-    
     print()
-    
+
     # ============================================================
-    # STRATEGY 5: Taker Ratio (Buy Pressure) 
+    # STRATEGY 5: Taker Ratio (Buy Pressure)
     # ============================================================
     print("STRATEGY 5: Buy Pressure (Taker Ratio)")
     print("-"*50)
+
+    ratios = np.array([0.55, 0.60, 0.65])
+    buy_totals, buy_wins = threshold_sweep(tr, ratios, wyb, above=True)
+    sell_totals, sell_wins = threshold_sweep(tr, 1 - ratios, wnb, above=False)
     
-    for ratio in [0.55, 0.60, 0.65]:
+    for i, ratio in enumerate(ratios):
         # High buy pressure - bet YES
-        mask = df['taker_ratio'] > ratio
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_yes'].sum()
-            total = mask.sum()
+        total, wins = int(buy_totals[i]), int(buy_wins[i])
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'Taker ratio > {ratio:.0%}',
@@ -297,12 +358,10 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  Taker ratio > {ratio:.0%} → Bet YES: {wins}/{total} = {wr:.1f}% win rate")
-        
+
         # Low buy pressure - bet NO
-        mask = df['taker_ratio'] < (1 - ratio)
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_no'].sum()
-            total = mask.sum()
+        total, wins = int(sell_totals[i]), int(sell_wins[i])
+        if total > 0:
             wr = wins / total * 100
             results.append({
                 'strategy': f'Taker ratio < {1-ratio:.0%}',
@@ -312,21 +371,24 @@ def test_momentum_strategies(df):
                 'win_rate': wr
             })
             print(f"  Taker ratio < {1-ratio:.0%} → Bet NO:  {wins}/{total} = {wr:.1f}% win rate")
-    
+
     print()
-    
+
     # ============================================================
     # STRATEGY 6: Whale Watcher (Volume Spikes)
     # ============================================================
     print("STRATEGY 6: Whale Watcher (Volume Spikes)")
     print("-"*50)
-    
+
+    up_5m = r5 > 0
     for vol_mult in [2.0, 3.0, 4.0, 5.0]:
+        spike = vol_ratio > vol_mult
+
         # Blow-off Top? (High Volume + Price Up -> Bet NO)
-        mask = (df['vol_ratio'] > vol_mult) & (df['return_5m'] > 0)
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_no'].sum()
-            total = mask.sum()
+        mask = np.logical_and(spike, up_5m, out=buf)
+        total = int(mask.sum())
+        if total > 0:
+            wins = int(wn[mask].sum())
             wr = wins / total * 100
             if total >= 10:
                 results.append({
@@ -337,12 +399,12 @@ def test_momentum_strategies(df):
                     'win_rate': wr
                 })
             print(f"  Volume > {vol_mult}x + Up → Bet NO (Fade): {wins}/{total} = {wr:.1f}% win rate")
-            
+
         # Panic Dump? (High Volume + Price Down -> Bet YES)
-        mask = (df['vol_ratio'] > vol_mult) & (df['return_5m'] < 0)
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_yes'].sum()
-            total = mask.sum()
+        mask = np.logical_and(spike, red_5m, out=buf)
+        total = int(mask.sum())
+        if total > 0:
+            wins = int(wy[mask].sum())
             wr = wins / total * 100
             if total >= 10:
                 results.append({
@@ -362,15 +424,16 @@ def test_momentum_strategies(df):
     print("STRATEGY 7: Rubber Band (Mean Reversion)")
     print("-"*50)
     # Logic: If price is > N std devs from MA15, bet reversion
-    
+
     for std_dev in [2.0, 2.5, 3.0]:
         # Price > Upper Band
         # ma_15_rel is (Close - MA) / MA. vol_15 is Std/Close.
         # We approximate: If ma_15_rel > N * vol_15
-        mask = df['ma_15_rel'] > (std_dev * df['vol_15'])
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_no'].sum()
-            total = mask.sum()
+        band = std_dev * vol15
+        mask = ma15 > band
+        total = int(mask.sum())
+        if total > 0:
+            wins = int(wn[mask].sum())
             wr = wins / total * 100
             if total >= 10:
                 results.append({
@@ -383,10 +446,10 @@ def test_momentum_strategies(df):
             print(f"  Price > {std_dev} SD (Top) → Bet NO: {wins}/{total} = {wr:.1f}% win rate")
 
         # Price < Lower Band
-        mask = df['ma_15_rel'] < -(std_dev * df['vol_15'])
-        if mask.sum() > 0:
-            wins = df.loc[mask, 'won_yes'].sum()
-            total = mask.sum()
+        mask = ma15 < -band
+        total = int(mask.sum())
+        if total > 0:
+            wins = int(wy[mask].sum())
             wr = wins / total * 100
             if total >= 10:
                 results.append({
@@ -405,17 +468,17 @@ def test_momentum_strategies(df):
     # ============================================================
     print("STRATEGY 8: Trend Surfer (MA Alignment)")
     print("-"*50)
-    
+
     # Full Uptrend: Price > MA5 > MA15 > MA30
-    # Note: Our relative MAs are (Price - MA)/MA. 
+    # Note: Our relative MAs are (Price - MA)/MA.
     # If Price > MA, rel > 0.
-    # We test explicit alignment. 
-    
+    # We test explicit alignment.
+
     # Simple Uptrend: Price > All MAs
-    mask_up = (df['ma_5_rel'] > 0) & (df['ma_15_rel'] > 0) & (df['ma_30_rel'] > 0)
-    if mask_up.sum() > 0:
-        wins = df.loc[mask_up, 'won_yes'].sum()
-        total = mask_up.sum()
+    mask_up = (ma5 > 0) & (ma15 > 0) & (ma30 > 0)
+    total = int(mask_up.sum())
+    if total > 0:
+        wins = int(wy[mask_up].sum())
         wr = wins / total * 100
         results.append({
             'strategy': 'Trend Surfer (Full Up)',
@@ -427,10 +490,10 @@ def test_momentum_strategies(df):
         print(f"  Full Uptrend (All MAs < Price) → Bet YES: {wins}/{total} = {wr:.1f}% win rate")
 
     # Full Downtrend
-    mask_down = (df['ma_5_rel'] < 0) & (df['ma_15_rel'] < 0) & (df['ma_30_rel'] < 0)
-    if mask_down.sum() > 0:
-        wins = df.loc[mask_down, 'won_no'].sum()
-        total = mask_down.sum()
+    mask_down = (ma5 < 0) & (ma15 < 0) & (ma30 < 0)
+    total = int(mask_down.sum())
+    if total > 0:
+        wins = int(wn[mask_down].sum())
         wr = wins / total * 100
         results.append({
             'strategy': 'Trend Surfer (Full Down)',
@@ -457,15 +520,13 @@ def test_momentum_strategies(df):
     
     return df_results
 
-def simulate_profit(df, strategy_mask, direction, bet_size=10):
-    """Simulate profit for a strategy assuming fair pricing"""
-    df = df.copy()
-    df['future_close'] = df['close'].shift(-15)
-    df['won_yes'] = (df['future_close'] > df['close']).astype(int)
-    df['won_no'] = (df['future_close'] <= df['close']).astype(int)
-    df = df.dropna()
-    
-    trades = df[strategy_mask]
+def simulate_profit(df_prepared, strategy_mask, direction, bet_size=10):
+    """
+    Simulate profit for a strategy assuming fair pricing.
+    df_prepared must already carry won_yes/won_no (see add_outcomes) and
+    strategy_mask must be aligned to it.
+    """
+    trades = df_prepared[strategy_mask]
     if len(trades) == 0:
         return 0, 0, 0
     
@@ -509,14 +570,23 @@ if __name__ == "__main__":
         label = "30 days"
     
     print(f"📊 Loading data (last {label})...")
-    df = pd.read_csv("data/btc_1min_data.csv", index_col='timestamp', parse_dates=True)
+    df = load_enriched_candles()
     
     # Filter to requested time window from the END of the data (most recent)
     if len(df) > minutes_to_keep:
         df = df.iloc[-minutes_to_keep:]
         print(f"   Filtered to {len(df):,} rows ({label})")
     
-    df = add_technical_indicators(df).dropna()
+    df = add_outcomes(df)  # Computed once; reusable by simulate_profit()
+    
+    # The strategy sweeps are memory-bound: float32 halves the bytes per pass.
+    # Returns/RSI/ratios don't need fp64 precision. 'close' stays fp64 since
+    # the settlement outcomes compare prices that differ by cents.
+    for c in ['return_5m', 'return_15m', 'rsi_14', 'vol_15', 'taker_ratio',
+              'vol_ratio', 'ma_5_rel', 'ma_15_rel', 'ma_30_rel']:
+        df[c] = df[c].astype('float32')
+    df['won_yes'] = df['won_yes'].astype('uint8')
+    df['won_no'] = df['won_no'].astype('uint8')
     
     results = test_momentum_strategies(df)
     
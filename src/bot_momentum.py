@@ -14,18 +14,45 @@ Optimal hours (UTC): 22, 06, 05, 01, 17, 00, 21, 16, 08, 10 (>70% win rate)
 import time
 import json
 import requests
-import pandas as pd
 import numpy as np
 import csv
 import os
-from datetime import datetime, timezone, timedelta
+import atexit
+from bisect import bisect_right
+from datetime import datetime
+
+try:
+    # orjson keeps save_state cheap on the trade/settle path
+    import orjson
+    _state_loads = orjson.loads
+    _state_dumps = lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    _state_loads = json.loads
+    _state_dumps = lambda obj: json.dumps(obj, indent=2).encode()
 
 # Reuse WebSocket from main bot
 from api import BinanceWSServer, KalshiAPI
-from features import add_technical_indicators
-from strategy import get_signal  # <--- SHARED LOGIC
+from features import add_technical_indicators_batch, LiveIndicatorStream
+from collector import load_candles_tail
+from strategy import get_signal, set_calibration  # <--- SHARED LOGIC
+
+def _iso_now():
+    """Local-time ISO-8601 timestamp with microseconds (same output as datetime.now().isoformat())"""
+    t = time.time()
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(t)) + f'.{int((t % 1) * 1e6):06d}'
+
+# Orderbook side whose bids we cross to buy each direction
+OPPOSITE_SIDE = {'YES': 'no', 'NO': 'yes'}
+
+# Optimal trading hours (UTC) - these have >70% win rate for RSI strategy
+BEST_HOURS_UTC = {22, 6, 5, 1, 17, 0, 21, 16, 8, 10}
+# Per-hour boost lookup (index = UTC hour)
+HOUR_BOOST = tuple(0.03 if h in BEST_HOURS_UTC else 0 for h in range(24))
 
 class SimpleMomentumBot:
+    _STATS_HEADER = "=" * 60
+    _STATS_DIVIDER = "  " + "-" * 60
+    
     def __init__(self):
         # Initialize connections
         self.ws = BinanceWSServer()
@@ -35,10 +62,20 @@ class SimpleMomentumBot:
         # State
         self.balance = 1000.0
         self.positions = []
+        self._open_tickers = set()  # Tickers of self.positions, for O(1) "already in market" checks
         self.wins = 0
         self.losses = 0
         self.last_trade_time = 0  # Cooldown tracking
         self.TRADE_COOLDOWN_SECONDS = 300  # 5 min between trades
+        self.SCAN_INTERVAL_SECONDS = 15    # Signal/market scan + settlement cadence
+        
+        # Market lookup caches
+        self._sorted_markets = []  # Last fetched markets with a close_time, sorted by close epoch
+        self._sorted_close_ts = []  # Close epochs for bisect, parallel to _sorted_markets
+        self._closetime_cache = {}  # (ticker, close_time str) -> epoch seconds
+        self.BOOK_CACHE_TTL = 1.0  # seconds
+        self._book_cache = {}  # ticker -> (fetched_at, orderbook)
+        self.slippage = 0.03  # Added to the crossed ask when pricing an entry
         
         # Session tracking
         self.session_start = time.time()
@@ -54,23 +91,31 @@ class SimpleMomentumBot:
         os.makedirs("logs", exist_ok=True)
         self._init_log()
         
-        # History for indicators
+        # Streaming indicator state (updated once per closed candle)
+        self._ind_state = LiveIndicatorStream()
+        self._last_ind_key = None  # (close, volume) of the live candle behind _last_ind
+        self._last_ind = None
+        self._last_bar_ts = None  # Epoch open time of the newest bar folded into _ind_state
+        
         self.update_data_file()  # <--- NEW: Auto-update data on startup
-        self.history_df = self.fetch_initial_history()
+        self.fetch_initial_history()
         
         # Auto-calibrate win rates from recent data
         self.calibrated_rates = self.calibrate_win_rates()
+        set_calibration(self.calibrated_rates)  # get_signal reads the rates from a table
         
         # State persistence
         self.state_file = "momentum_bot_state.json"
         
     def update_data_file(self):
         """Run collector to get fresh data for calibration"""
-        from collector import BinanceDataCollector
+        from collector import migrate_csv_to_parquet, newest_candle_file, update_candle_file
+        
+        migrate_csv_to_parquet()
         
         # Freshness Check: Skip if file is less than 60 mins old
-        file_path = "data/btc_1min_data.csv"
-        if os.path.exists(file_path):
+        file_path = newest_candle_file()
+        if file_path:
             modified_time = os.path.getmtime(file_path)
             age_minutes = (time.time() - modified_time) / 60
             if age_minutes < 60:
@@ -82,12 +127,8 @@ class SimpleMomentumBot:
 
         print("🔄 Updating historical data for calibration...")
         try:
-            collector = BinanceDataCollector()
-            # Fetch last 30 days to be safe
-            raw = collector.fetch_historical_data(days=30)
-            df = collector.to_dataframe(raw)
-            os.makedirs("data", exist_ok=True)
-            df.to_csv(file_path)
+            # Keep the last 30 days to be safe; only candles newer than the file are fetched
+            df, _ = update_candle_file(days=30)
             print(f"✅ Data updated: {len(df):,} records")
         except Exception as e:
             print(f"⚠️ Data update failed: {e}")
@@ -104,72 +145,72 @@ class SimpleMomentumBot:
         print(f"📊 Auto-calibrating win rates from last {days} days...")
         
         try:
-            # Try to load historical data
-            df = pd.read_csv("data/btc_1min_data.csv", index_col='timestamp', parse_dates=True)
-            
-            # Filter to last N days
+            # Load only the last N days (and only the OHLCV columns) of historical data
             minutes_to_keep = days * 24 * 60
-            if len(df) > minutes_to_keep:
-                df = df.iloc[-minutes_to_keep:]
+            df = load_candles_tail(minutes_to_keep)
             
-            df = add_technical_indicators(df).dropna()
+            df = add_technical_indicators_batch(df).dropna()
             
-            # Calculate future outcome (15 min lookahead)
-            df['future_close'] = df['close'].shift(-15)
-            df['won_yes'] = (df['future_close'] > df['close']).astype(int)
-            df['won_no'] = (df['future_close'] <= df['close']).astype(int)
-            df = df.dropna()
+            # Work on raw NumPy arrays (no pandas label alignment / filtered Series copies).
+            # Outcome = price 15 min later vs now, so the last 15 rows have no outcome.
+            close = df['close'].to_numpy()
+            won_yes = close[15:] > close[:-15]   # BTC went up
+            won_no = ~won_yes                     # BTC went down or flat
+            rsi = df['rsi_14'].to_numpy()[:-15]
+            r5 = df['return_5m'].to_numpy()[:-15]
+            r15 = df['return_15m'].to_numpy()[:-15]
+            dip = r5 < 0
             
             rates = {}
             
             # RSI > 80 (No Confirmation) - Extreme
-            mask = df['rsi_14'] > 80
+            mask = rsi > 80
             if mask.sum() >= 20:
-                rates['rsi_80'] = df.loc[mask, 'won_no'].mean()
+                rates['rsi_80'] = won_no[mask].mean()
             else:
                 rates['rsi_80'] = 0.676  # Default
             
             # 1. RSI > 80 + DIP (Golden Signal)
-            mask = (df['rsi_14'] > 80) & (df['return_5m'] < 0)
+            mask = (rsi > 80) & dip
             if mask.sum() >= 5: # Rare signal, lower threshold
-                rates['rsi_80_confirm'] = df.loc[mask, 'won_no'].mean()
+                rates['rsi_80_confirm'] = won_no[mask].mean()
             else:
                 rates['rsi_80_confirm'] = 0.806  # Default
 
             # 2. RSI > 75 + DIP (High Confidence)
-            mask = (df['rsi_14'] > 75) & (df['return_5m'] < 0)
+            mask = (rsi > 75) & dip
             if mask.sum() >= 10:
-                rates['rsi_75_confirm'] = df.loc[mask, 'won_no'].mean()
+                rates['rsi_75_confirm'] = won_no[mask].mean()
             else:
                 rates['rsi_75_confirm'] = 0.777  # Default
 
             # 3. RSI > 65 + DIP (Turbo Mode - Expanded)
             # Replaced RSI > 70 with RSI > 65 to double trade volume with same WR
-            mask = (df['rsi_14'] > 65) & (df['return_5m'] < 0)
+            mask = (rsi > 65) & dip
             if mask.sum() >= 40: # High frequency, need robust sample
-                rates['rsi_65_confirm'] = df.loc[mask, 'won_no'].mean()
+                rates['rsi_65_confirm'] = won_no[mask].mean()
             else:
                 rates['rsi_65_confirm'] = 0.719  # Default
 
             # 4. RSI < 30 (Oversold Bounce)
-            mask = df['rsi_14'] < 30
+            mask = rsi < 30
             if mask.sum() >= 50:
-                rates['rsi_30_oversold'] = df.loc[mask, 'won_yes'].mean()
+                rates['rsi_30_oversold'] = won_yes[mask].mean()
             else:
                 rates['rsi_30_oversold'] = 0.666 # Default
             
             # 15m drop < -0.5% → YES (Loosened from -0.6% for Turbo Volume)
-            mask = df['return_15m'] < -0.005
+            mask = r15 < -0.005
             if mask.sum() >= 20:
-                rates['15m_drop'] = df.loc[mask, 'won_yes'].mean()
+                rates['15m_drop'] = won_yes[mask].mean()
             else:
                 rates['15m_drop'] = 0.708  # Default
             
             # 15m spike > 0.8% → NO (Tightened from 0.4%)
             # Previous strong spike signal was weak. Only fading extreme moves now.
-            mask = (df['return_15m'] > 0.008) & (df['return_5m'] < 0)
+            mask = (r15 > 0.008) & dip
             if mask.sum() >= 20:
-                rates['15m_spike'] = df.loc[mask, 'won_no'].mean()
+                rates['15m_spike'] = won_no[mask].mean()
             else:
                 rates['15m_spike'] = 0.60  # Conservative default
             
@@ -189,12 +230,17 @@ class SimpleMomentumBot:
             }
         
     def _init_log(self):
-        with open(self.log_file, 'a', newline='') as f:
-            if f.tell() == 0:
-                csv.writer(f).writerow([
-                    'timestamp', 'ticker', 'direction', 'signal', 
-                    'rsi', 'return_15m', 'price', 'contracts', 'status', 'pnl'
-                ])
+        # Keep both log files open for the whole session (line-buffered, so every row still hits disk)
+        self._trade_fh = open(self.log_file, 'a', newline='', buffering=1)
+        self._trade_writer = csv.writer(self._trade_fh)
+        if self._trade_fh.tell() == 0:
+            self._trade_writer.writerow([
+                'timestamp', 'ticker', 'direction', 'signal', 
+                'rsi', 'return_15m', 'price', 'contracts', 'status', 'pnl'
+            ])
+        self._event_fh = open(self.event_log, 'a', buffering=1)
+        atexit.register(self._trade_fh.close)
+        atexit.register(self._event_fh.close)
     
     def save_state(self):
         state = {
@@ -203,89 +249,112 @@ class SimpleMomentumBot:
             'wins': self.wins,
             'losses': self.losses
         }
-        with open(self.state_file, 'w') as f:
-            json.dump(state, f, indent=4)
+        with open(self.state_file, 'wb') as f:
+            f.write(_state_dumps(state))
     
     def load_state(self):
         try:
-            with open(self.state_file, 'r') as f:
-                state = json.load(f)
+            with open(self.state_file, 'rb') as f:
+                state = _state_loads(f.read())
                 self.balance = state.get('balance', 1000.0)
                 self.positions = state.get('positions', [])
+                for pos in self.positions:
+                    # Backfill for state files saved before positions carried an epoch close time
+                    if '_close_ts' not in pos:
+                        pos['_close_ts'] = self.close_ts(pos['ticker'], pos['close_time'])
+                self._open_tickers = {pos['ticker'] for pos in self.positions}
                 self.wins = state.get('wins', 0)
                 self.losses = state.get('losses', 0)
                 print(f"🔄 Resumed: ${self.balance:.2f}, {len(self.positions)} open positions")
         except FileNotFoundError:
             print("🆕 Starting fresh with $1000")
     
-    def fetch_initial_history(self):
-        """Fetch last 100 mins of data to warm up indicators (using Kraken)"""
-        print("📥 Warming up historical data from Kraken...")
+    def _fetch_kraken_ohlc(self, since=None):
+        """
+        Closed 1-min Kraken candles as [time, open, high, low, close, vwap, volume, count]
+        rows (up to the last 720), optionally only those after `since` (epoch seconds).
+        Returns [] on any error.
+        """
         url = "https://api.kraken.com/0/public/OHLC"
-        resp = requests.get(url, params={"pair": "XBTUSD", "interval": 1})
-        data = resp.json()
+        params = {"pair": "XBTUSD", "interval": 1}
+        if since is not None:
+            params["since"] = int(since)
+        try:
+            data = requests.get(url, params=params, timeout=10).json()
+        except Exception as e:
+            print(f"⚠️ Kraken OHLC request failed: {e}")
+            return []
         
         if data.get('error') and len(data['error']) > 0:
             print(f"⚠️ Kraken API error: {data['error']}")
-            # Return empty dataframe with correct structure
-            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume', 'taker_buy_base'])
+            return []
         
-        # Kraken returns: {result: {XXBTZUSD: [[time, open, high, low, close, vwap, volume, count], ...]}}
-        ohlc_data = list(data.get('result', {}).values())[0] if data.get('result') else []
+        # Kraken returns: {result: {XXBTZUSD: [[time, open, high, low, close, vwap, volume, count], ...], last: ...}}
+        result = data.get('result') or {}
+        ohlc_data = next((v for k, v in result.items() if k != 'last'), [])
+        return ohlc_data[:-1]  # The last row is the still-open minute
+    
+    def _feed_kraken_rows(self, rows):
+        """Fold Kraken OHLC rows into the indicator state, in order"""
+        # Rows are [time, open, high, low, close, vwap, volume, count] (prices as strings)
+        values = np.asarray(rows)[:, :7].astype(np.float64)  # One vectorized cast for all numeric columns
+        for t, o, h, l, c, vwap, vol in values.tolist():
+            self._ind_state.update(c, h, l, vol, vol * 0.5)  # taker_buy_base estimate (Kraken doesn't provide it)
+        self._last_bar_ts = int(values[-1, 0])
+        self._last_ind_key = None
+    
+    def fetch_initial_history(self):
+        """Fetch last 100 mins of data to warm up the indicator state (using Kraken)"""
+        print("📥 Warming up historical data from Kraken...")
+        candles = self._fetch_kraken_ohlc()
         
-        if not ohlc_data or len(ohlc_data) < 2:
+        if not candles:
             print("⚠️ No OHLC data from Kraken")
-            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume', 'taker_buy_base'])
-        
-        # Take last 100 candles (skip the 'last' timestamp at end)
-        candles = ohlc_data[-101:-1] if len(ohlc_data) > 100 else ohlc_data[:-1]
+            return 0
         
-        df = pd.DataFrame(candles, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'vwap', 'volume', 'count'
-        ])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].astype(float)
-        df['taker_buy_base'] = df['volume'] * 0.5  # Estimate (Kraken doesn't provide this)
-        df.set_index('timestamp', inplace=True)
-        print(f"   Loaded {len(df)} candles")
-        return df
+        # Take last 100 candles
+        candles = candles[-100:]
+        self._feed_kraken_rows(candles)
+        print(f"   Loaded {len(candles)} candles")
+        return len(candles)
     
     def update_history(self):
-        """Update history with latest candle"""
-        if self.ws.current_candle:
-            c = self.ws.current_candle
-            if c['is_closed']:
-                new_row = pd.Series({
-                    'open': c['open'], 'high': c['high'], 'low': c['low'],
-                    'close': c['close'], 'vwap': c['close'],  # Use close as vwap estimate
-                    'volume': c['volume'], 'count': 1,
-                    'taker_buy_base': c['taker_buy_base']
-                }, name=c['timestamp'])
-                self.history_df = pd.concat([self.history_df, new_row.to_frame().T])
-                if len(self.history_df) > 100:
-                    self.history_df = self.history_df.iloc[-100:]
+        """Update indicator state with every candle closed since the last call"""
+        c = self.ws.pop_closed_candle()
+        while c:
+            bar_ts = int(c['timestamp'].timestamp())
+            # The WS starts before the warm-up, so its first bars can already be in the state
+            if self._last_bar_ts is None or bar_ts > self._last_bar_ts:
+                if self._last_bar_ts is not None and bar_ts > self._last_bar_ts + 60:
+                    self._catch_up(bar_ts)
+                self._ind_state.update_bar(c)
+                self._last_bar_ts = bar_ts
+                self._last_ind_key = None  # New candle: always recompute
+            c = self.ws.pop_closed_candle()
     
-    def get_current_indicators(self):
-        """Calculate current technical indicators"""
-        temp_df = self.history_df.copy()
-        
-        # Add current (incomplete) candle
-        if self.ws.current_candle:
-            c = self.ws.current_candle
-            new_row = {
-                'open': c['open'], 'high': c['high'], 'low': c['low'],
-                'close': c['close'], 'vwap': c['close'],
-                'volume': c['volume'], 'count': 1,
-                'taker_buy_base': c['taker_buy_base']
-            }
-            temp_df.loc[c['timestamp']] = new_row
-        
-        df = add_technical_indicators(temp_df)
-        return df.iloc[-1].to_dict()
+    def _catch_up(self, bar_ts):
+        """Fill minutes missing between the state and the WS bar at bar_ts from Kraken's REST candles"""
+        rows = [r for r in self._fetch_kraken_ohlc(since=self._last_bar_ts) if self._last_bar_ts < int(r[0]) < bar_ts]
+        if rows:
+            self._feed_kraken_rows(rows)
+            print(f"   Caught up {len(rows)} missed candle(s)")
     
-    # Optimal trading hours (UTC) - these have >70% win rate for RSI strategy
-    BEST_HOURS_UTC = {22, 6, 5, 1, 17, 0, 21, 16, 8, 10}
+    def get_current_indicators(self, c=None):
+        """Calculate current technical indicators"""
+        # Merge the current (incomplete) candle into the closed-candle state without committing it
+        if c is None:
+            c = self.ws.get_current_candle()
+        if not c:
+            return dict(self._ind_state.last)
+        
+        # No new trades since the last call -> same indicators
+        key = (c['close'], c['volume'])
+        if key == self._last_ind_key:
+            return self._last_ind
+        
+        self._last_ind = self._ind_state.peek_bar(c)
+        self._last_ind_key = key
+        return self._last_ind
     
     def get_signal(self, indicators):
         """
@@ -293,15 +362,14 @@ class SimpleMomentumBot:
         Adds hourly boosts on top of the base signal.
         """
         # Get base signal from shared library
-        rates = getattr(self, 'calibrated_rates', {})
-        result = get_signal(indicators, rates)
+        result = get_signal(indicators)
         
         if result:
             direction, signal_name, wr = result
             
             # Contextual Boosts (Bot-specific knowledge)
-            current_hour = datetime.now(timezone.utc).hour
-            hour_boost = 0.03 if current_hour in self.BEST_HOURS_UTC else 0
+            current_hour = int(time.time() // 3600) % 24  # Epoch seconds are UTC
+            hour_boost = HOUR_BOOST[current_hour]
             
             return (direction, signal_name, wr + hour_boost)
             
@@ -329,68 +397,54 @@ class SimpleMomentumBot:
         bet = self.balance * fraction
         return min(bet, 50.0)  # Hard cap at $50
     
-    def find_best_market(self):
-        """Find best KXBTC15M market to trade"""
+    def get_series_markets(self):
+        """Fetch the KXBTC15M markets and rebuild the sorted close-time index"""
+        # Not TTL-cached: find_best_market only runs on a signal, at most once per scan interval
         markets = self.kalshi.get_markets()
-        
         if not markets:
              self.log_event("WARNING: API returned 0 markets during search", level="WARNING")
+             self._sorted_close_ts, self._sorted_markets = [], []
+             return markets
+        
+        markets = [m for m in markets if m.get('ticker', '').upper().startswith('KXBTC15M')]
+        
+        timed = sorted(
+            ((self.close_ts(m['ticker'], m['close_time']), m) for m in markets if m.get('close_time')),
+            key=lambda x: x[0]
+        )
+        self._sorted_close_ts = [ts for ts, _ in timed]
+        self._sorted_markets = [m for _, m in timed]
+        return markets
+    
+    def close_ts(self, ticker, close_time_str):
+        """Epoch seconds for a market close_time (ISO string), memoized per (ticker, string)"""
+        key = (ticker, close_time_str)
+        ts = self._closetime_cache.get(key)
+        if ts is None:
+            ts = datetime.fromisoformat(close_time_str.replace('Z', '+00:00')).timestamp()
+            self._closetime_cache[key] = ts
+        return ts
+    
+    def find_best_market(self):
+        """Find best KXBTC15M market to trade"""
+        self.get_series_markets()  # Refreshes the sorted close-time index
         
-        now = datetime.now(timezone.utc)
+        now = time.time()
+        close_ts = self._sorted_close_ts
         
+        # WIDENED WINDOW: 2 to roughly 15 minutes -> earliest close strictly after now+120
         best_market = None
-        best_time_to_close = float('inf')
+        i = bisect_right(close_ts, now + 120)
+        if i < len(close_ts) and close_ts[i] - now < 880:
+            best_market = self._sorted_markets[i]
         
-        # Diagnostics
+        # Diagnostics: closest market still open, in case nothing is in the window
         closest_market_debug = None
         closest_market_ttc = float('inf')
-        
-        count_series = 0
-        
-        for m in markets:
-            ticker = m.get('ticker', '')
-            if not ticker.upper().startswith('KXBTC15M'):
-                continue
-            
-            count_series += 1
-            
-            close_time_str = m.get('close_time')
-            if not close_time_str:
-                continue
-            
-            close_dt = datetime.fromisoformat(close_time_str.replace('Z', '+00:00'))
-            time_to_close = (close_dt - now).total_seconds()
-            
-            # WIDENED WINDOW: 2 to roughly 15 minutes
-            if 120 < time_to_close < 880:
-                if time_to_close < best_time_to_close:
-                    best_time_to_close = time_to_close
-                    best_market = m
-            
-            # Track closest market for debug if we fail to find one
-            if 0 < time_to_close < closest_market_ttc:
-                 closest_market_ttc = time_to_close
-                 closest_market_debug = ticker
-
-        if not best_market and count_series > 0:
-             # Only log if we expected to find something but didn't
-             # This helps debug "Singal skipped" messages
-             pass 
-             # I'll let the caller log "Market not found", but here I can store debug info
-             # specific to why. 
-             # Actually, let's just log here if we are confused. 
-             # But this runs every 15s, so I don't want to spam headers unless a signal is pending.
-             # The caller (run loop) knows if a signal is pending. 
-             # Let's just return extra info? No, keep signature simple.
-             # I will log diagnostics ONION-style only if I failed to find a market 
-             # but found markets in the series.
-             pass
-
-        if not best_market and self.signals_seen > 0: # Heuristic: if we are active
-             # We can't easily know if the caller HAS a signal right now without changing method signature.
-             # So I will just add the debug print logic to the CALLER site in run(), 
-             # OR I just log a debug line here every time we fail? No, too spammy.
-             pass
+        j = bisect_right(close_ts, now)
+        if j < len(close_ts):
+            closest_market_debug = self._sorted_markets[j]['ticker']
+            closest_market_ttc = close_ts[j] - now
 
         # Retaining original return, but with added logging in case of suspicious failure
         if not best_market and closest_market_debug and closest_market_ttc < 3600:
@@ -401,53 +455,47 @@ class SimpleMomentumBot:
     
     def get_best_price(self, ticker, direction):
         """Get best ask price for direction"""
-        book = self.kalshi.get_orderbook(ticker)
-        if not book:
-            return None
-        
-        if direction == 'YES':
-            # To buy YES, cross the NO bid (or use YES ask)
-            no_bids = book.get('no', [])
-            if no_bids:
-                best_no_bid = no_bids[-1][0]
-                yes_ask = (100 - best_no_bid) / 100.0
-                return yes_ask + 0.03  # Add slippage
+        # Reuse a book fetched within the last BOOK_CACHE_TTL seconds
+        now = time.time()
+        cached = self._book_cache.get(ticker)
+        if cached and now - cached[0] <= self.BOOK_CACHE_TTL:
+            book = cached[1]
         else:
-            # To buy NO, cross the YES bid
-            yes_bids = book.get('yes', [])
-            if yes_bids:
-                best_yes_bid = yes_bids[-1][0]
-                no_ask = (100 - best_yes_bid) / 100.0
-                return no_ask + 0.03  # Add slippage
-        
-        return None
+            book = self.kalshi.get_orderbook(ticker)
+            if not book:
+                return None
+            self._book_cache = {ticker: (now, book)}  # Only the latest ticker is worth keeping
+        
+        # To buy one side, cross the best bid on the opposite side
+        bids = book.get(OPPOSITE_SIDE[direction])
+        if not bids:
+            return None
+        return (100 - bids[-1][0]) / 100.0 + self.slippage
     
     def log_trade(self, trade, status, pnl=0.0):
-        with open(self.log_file, 'a', newline='') as f:
-            csv.writer(f).writerow([
-                datetime.now().isoformat(),
-                trade['ticker'],
-                trade['direction'],
-                trade['signal'],
-                trade.get('rsi', ''),
-                trade.get('return_15m', ''),
-                trade['price'],
-                trade['contracts'],
-                status,
-                pnl
-            ])
+        self._trade_writer.writerow([
+            _iso_now(),
+            trade['ticker'],
+            trade['direction'],
+            trade['signal'],
+            trade.get('rsi', ''),
+            trade.get('return_15m', ''),
+            trade['price'],
+            trade['contracts'],
+            status,
+            pnl
+        ])
     
     def settle_positions(self):
         """Check and settle expired positions"""
-        now = datetime.now(timezone.utc)
+        now_ts = time.time()
         new_positions = []
         
         for pos in self.positions:
-            close_time = datetime.fromisoformat(pos['close_time'].replace('Z', '+00:00'))
-            
-            if now > close_time + timedelta(seconds=60):
+            if now_ts > pos['_close_ts'] + 60:
                 # Guard: skip if already settled (prevents double processing)
                 if pos.get('settled'):
+                    self._open_tickers.discard(pos['ticker'])
                     continue
                 
                 # Try to get result
@@ -471,19 +519,22 @@ class SimpleMomentumBot:
                 
                 self.log_trade(pos, 'SETTLED', profit)
                 
-                settle_msg = (
-                    f"\n{'='*60}\n"
-                    f"{'✅ WIN' if won else '❌ LOSS'}: {pos['ticker']}\n"
-                    f"   Signal: {pos['signal']}\n"
-                    f"   Result: {result}\n"
-                    f"   P&L: ${profit:+.2f}\n"
-                    f"   Balance: ${self.balance:.2f} (W:{self.wins} L:{self.losses})\n"
-                    f"{'='*60}\n"
-                )
+                settle_msg = "\n".join((
+                    "",
+                    self._STATS_HEADER,
+                    f"{'✅ WIN' if won else '❌ LOSS'}: {pos['ticker']}",
+                    f"   Signal: {pos['signal']}",
+                    f"   Result: {result}",
+                    f"   P&L: ${profit:+.2f}",
+                    f"   Balance: ${self.balance:.2f} (W:{self.wins} L:{self.losses})",
+                    self._STATS_HEADER,
+                    ""
+                ))
                 self.log_event(settle_msg, level="SETTLED")
                 
                 # Mark as settled to prevent double processing
                 pos['settled'] = True
+                self._open_tickers.discard(pos['ticker'])
                 
                 self.save_state()
                 
@@ -497,12 +548,11 @@ class SimpleMomentumBot:
     
     def log_event(self, message, level="INFO"):
         """Write to event log file AND print to console"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         log_line = f"[{timestamp}] [{level}] {message}"
         
         # 1. Write to file
-        with open(self.event_log, 'a') as f:
-            f.write(log_line + "\n")
+        self._event_fh.write(log_line + "\n")
             
         # 2. Print to console (so user sees it matches)
         print(log_line, flush=True)
@@ -518,24 +568,26 @@ class SimpleMomentumBot:
         pnl = self.balance - self.initial_balance
         
         if self.last_trade_time > 0:
-            last_trade_str = datetime.fromtimestamp(self.last_trade_time).strftime("%H:%M:%S")
+            last_trade_str = time.strftime("%H:%M:%S", time.localtime(self.last_trade_time))
         else:
             last_trade_str = "None"
             
-        stats_msg = (
-            f"\n\n{'='*60}\n"
-            f"🚀 MOMENTUM BOT STATUS (Runtime: {hours}h {mins}m)\n"
-            f"{'='*60}\n"
-            f"  💰 Total Balance: ${self.balance:.2f} (Total P&L: ${pnl:+.2f})\n"
-            f"  📈 Total Record:  {self.wins}W - {self.losses}L ({win_rate:.1f}% WR)\n"
-            f"  ------------------------------------------------------------\n"
-            f"  📡 Session Signals Seen:  {self.signals_seen}\n"
-            f"  ✅ Session Trades Taken:  {self.signals_taken}\n"
-            f"  🕒 Last Trade Time:       {last_trade_str}\n"
-            f"  ⏳ Session Skipped:       {self.signals_skipped_cooldown} (Cool) + {self.signals_skipped_price} (Price)\n"
-            f"  📂 Open Positions:        {len(self.positions)}\n"
-            f"{'='*60}\n"
-        )
+        stats_msg = "\n".join((
+            "", "",
+            self._STATS_HEADER,
+            f"🚀 MOMENTUM BOT STATUS (Runtime: {hours}h {mins}m)",
+            self._STATS_HEADER,
+            f"  💰 Total Balance: ${self.balance:.2f} (Total P&L: ${pnl:+.2f})",
+            f"  📈 Total Record:  {self.wins}W - {self.losses}L ({win_rate:.1f}% WR)",
+            self._STATS_DIVIDER,
+            f"  📡 Session Signals Seen:  {self.signals_seen}",
+            f"  ✅ Session Trades Taken:  {self.signals_taken}",
+            f"  🕒 Last Trade Time:       {last_trade_str}",
+            f"  ⏳ Session Skipped:       {self.signals_skipped_cooldown} (Cool) + {self.signals_skipped_price} (Price)",
+            f"  📂 Open Positions:        {len(self.positions)}",
+            self._STATS_HEADER,
+            ""
+        ))
         
         self.log_event(stats_msg, level="STATS")
     
@@ -553,29 +605,32 @@ class SimpleMomentumBot:
         
         while True:
             try:
+                now = time.time()  # One clock sample per iteration (refreshed after network calls)
                 self.update_history()
                 
-                if self.ws.current_candle is None:
+                # Poll the live candle once per loop (built on demand by the WS client)
+                candle = self.ws.get_current_candle()
+                if candle is None:
                     time.sleep(1)
                     continue
                 
                 # Check for stale data - force reconnect if needed
-                staleness = time.time() - self.ws.last_update
+                staleness = now - self.ws.last_update
                 if staleness > 15:
                     self.log_event(f"WebSocket stale ({int(staleness)}s) - reconnecting...", level="WARNING")
                     self.ws.force_reconnect()
                     time.sleep(3)
                     continue
                 
-                current_price = self.ws.current_candle['close']
-                indicators = self.get_current_indicators()
+                current_price = candle['close']
+                indicators = self.get_current_indicators(candle)
                 signal = self.get_signal(indicators)
                 
                 # Status line with more info
                 rsi = indicators.get('rsi_14', 0)
                 ret15 = indicators.get('return_15m', 0) * 100
                 ret5 = indicators.get('return_5m', 0) * 100
-                cooldown_left = max(0, self.TRADE_COOLDOWN_SECONDS - (time.time() - self.last_trade_time))
+                cooldown_left = max(0, self.TRADE_COOLDOWN_SECONDS - (now - self.last_trade_time))
                 
                 # Create a narrative status message
                 status_msg = ""
@@ -593,23 +648,23 @@ class SimpleMomentumBot:
                     status_msg = "Watching the market. No strong patterns detected yet."
 
                 # Status Update (Heartbeat) - Every 60 seconds
-                if time.time() - last_explanation_time > 60:
-                    last_explanation_time = time.time()
+                if now - last_explanation_time > 60:
+                    last_explanation_time = now
                     hb_msg = f"Heartbeat: {status_msg} [BTC: ${current_price:,.0f}]"
                     self.log_event(hb_msg, level="HEARTBEAT")
 
                 
                 # Print stats every 5 minutes
-                if time.time() - self.last_stats_print > 300:
-                    self.last_stats_print = time.time()
+                if now - self.last_stats_print > 300:
+                    self.last_stats_print = now
                     self.print_session_stats()
                 
                 # Scan every 15 seconds
-                if time.time() - last_scan > 15:
-                    last_scan = time.time()
+                if now - last_scan >= self.SCAN_INTERVAL_SECONDS:
+                    last_scan = now
                     
                     # Check cooldown - avoid clustered signals
-                    time_since_trade = time.time() - self.last_trade_time
+                    time_since_trade = now - self.last_trade_time
                     in_cooldown = time_since_trade < self.TRADE_COOLDOWN_SECONDS
                     
                     if signal:
@@ -631,10 +686,11 @@ class SimpleMomentumBot:
                                 ticker = market['ticker']
                                 
                                 # Skip if already in this market
-                                if any(p['ticker'] == ticker for p in self.positions):
+                                if ticker in self._open_tickers:
                                     self.log_event(f"Signal skipped (already in market): {ticker}")
                                 else:
                                     price = self.get_best_price(ticker, direction)
+                                    now = time.time()  # Market/orderbook lookups may have taken a while
                                     
                                     if not price or price <= 0.10 or price >= 0.90:
                                         self.signals_skipped_price += 1
@@ -667,7 +723,7 @@ class SimpleMomentumBot:
                                             
                                                 if contracts >= 1 and cost <= self.balance:
                                                     self.balance -= cost
-                                                    self.last_trade_time = time.time()
+                                                    self.last_trade_time = now
                                                     self.signals_taken += 1
                                                     
                                                     trade = {
@@ -678,9 +734,11 @@ class SimpleMomentumBot:
                                                         'return_15m': ret15,
                                                         'price': price,
                                                         'contracts': contracts,
-                                                        'close_time': market['close_time']
+                                                        'close_time': market['close_time'],
+                                                        '_close_ts': self.close_ts(ticker, market['close_time'])
                                                     }
                                                     self.positions.append(trade)
+                                                    self._open_tickers.add(ticker)
                                                     self.log_trade(trade, 'OPENED')
                                                     self.save_state()
                                                     
@@ -695,7 +753,8 @@ class SimpleMomentumBot:
                     
                     self.settle_positions()
                 
-                time.sleep(1)
+                # Nothing acts between scans, so sleep until the next one instead of waking every second
+                time.sleep(max(0.1, last_scan + self.SCAN_INTERVAL_SECONDS - time.time()))
                 
             except KeyboardInterrupt:
                 print(f"\n\n{'='*60}")
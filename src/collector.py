@@ -4,75 +4,318 @@ Fetches historical 1-minute candles from Binance
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import numpy as np
 import time
+import asyncio
 from datetime import datetime, timedelta, timezone
 import os
 
+try:
+    # Optional: concurrent kline downloads (falls back to sequential requests)
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    # orjson parses the kline responses straight from bytes
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+DATA_CSV = "data/btc_1min_data.csv"
+DATA_PARQUET = "data/btc_1min_data.parquet"
+
+def load_candles(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """
+    Load the 1-min candle history.
+    Reads a Parquet copy of the CSV (typed columns, no date parsing) and
+    rebuilds it whenever the CSV is newer. Falls back to plain CSV if
+    pyarrow isn't installed.
+    """
+    try:
+        csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else None
+        if os.path.exists(parquet_path) and (csv_mtime is None or os.path.getmtime(parquet_path) >= csv_mtime):
+            return pd.read_parquet(parquet_path, engine='pyarrow')
+        
+        df = pd.read_csv(csv_path, index_col='timestamp', parse_dates=True)
+        df.to_parquet(parquet_path, engine='pyarrow', compression='zstd')
+        return df
+    except ImportError:
+        return pd.read_csv(csv_path, index_col='timestamp', parse_dates=True)
+
+def migrate_csv_to_parquet(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """
+    One-shot migration: convert the candle CSV to Parquet and delete the CSV.
+    No-op if the Parquet file already exists or pyarrow isn't installed.
+    """
+    if os.path.exists(parquet_path) or not os.path.exists(csv_path):
+        return
+    try:
+        df = pd.read_csv(csv_path, index_col='timestamp', parse_dates=True)
+        df.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=True)
+    except ImportError:
+        return
+    os.remove(csv_path)
+    print(f"📦 Migrated {csv_path} -> {parquet_path}")
+
+def newest_candle_file(csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Path of the most recently written candle file (Parquet wins ties), or None"""
+    paths = [p for p in (parquet_path, csv_path) if os.path.exists(p)]
+    return max(paths, key=os.path.getmtime) if paths else None
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'taker_buy_base']
+
+def load_candles_tail(n_rows, csv_path=DATA_CSV, parquet_path=DATA_PARQUET, columns=CANDLE_COLUMNS):
+    """
+    Load only the last n_rows candles (and only `columns`).
+    Reads the Parquet file when it is the newest copy; otherwise uses
+    pyarrow's multithreaded CSV reader and slices the table before
+    converting to pandas. Falls back to pandas if pyarrow isn't installed.
+    """
+    try:
+        if newest_candle_file(csv_path, parquet_path) == parquet_path:
+            df = pd.read_parquet(parquet_path, engine='pyarrow', columns=[c for c in columns if c != 'timestamp'])
+            return df.iloc[-n_rows:]
+        
+        from pyarrow import csv as pacsv
+        tbl = pacsv.read_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(use_threads=True),
+            convert_options=pacsv.ConvertOptions(include_columns=columns)
+        )
+        if tbl.num_rows > n_rows:
+            tbl = tbl.slice(tbl.num_rows - n_rows)
+        return tbl.to_pandas().set_index('timestamp')
+    except ImportError:
+        df = pd.read_csv(csv_path, usecols=columns, index_col='timestamp', parse_dates=True)
+        return df.iloc[-n_rows:]
+
+def save_candles(df, csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """Write the candle file (Parquet, or CSV without pyarrow). Returns the path written."""
+    os.makedirs(os.path.dirname(parquet_path) or ".", exist_ok=True)
+    try:
+        df.to_parquet(parquet_path, compression="zstd", engine="pyarrow")
+        return parquet_path
+    except ImportError:
+        df.to_csv(csv_path)  # No pyarrow: keep the CSV format
+        return csv_path
+
+def update_candle_file(days=30, csv_path=DATA_CSV, parquet_path=DATA_PARQUET):
+    """
+    Bring the candle file up to date and trim it to the last `days` days.
+    Downloads from the last candle on disk onwards (holes inside the file,
+    e.g. exchange outage minutes, are left alone); a missing or unreadable
+    file triggers a full fetch. The still-open current minute is never saved.
+    Raises KlineFetchError, without touching the file, if any window still
+    fails after retries.
+    Returns (DataFrame, path written).
+    """
+    collector = BinanceDataCollector()
+    existing = None
+    if newest_candle_file(csv_path, parquet_path):
+        try:
+            existing = load_candles(csv_path, parquet_path)
+            if existing.index.tz is None:
+                existing.index = existing.index.tz_localize('UTC')  # Older CSVs are naive UTC
+        except Exception as e:
+            print(f"⚠️ Couldn't read existing candles ({e}), refetching everything")
+            existing = None
+    
+    start_time = None
+    if existing is not None and len(existing):
+        # Re-request the last candle too; the newer copy wins in the de-dup below
+        start_time = existing.index.max().to_pydatetime()
+    
+    new = collector.to_dataframe_from_buf(collector.fetch_historical_data(days=days, start_time=start_time))
+    if existing is not None and set(new.columns) <= set(existing.columns):
+        df = pd.concat([existing[new.columns], new]).astype(new.dtypes.to_dict())
+    else:
+        df = new
+    
+    # Window boundaries overlap by one candle; keep the newest copy of each minute
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    now = pd.Timestamp.now(tz='UTC')
+    # The window ends at "now", so the last kline is the partly filled current minute
+    df = df[(df.index >= now - pd.Timedelta(days=days)) & (df.index < now.floor('min'))]
+    return df, save_candles(df, csv_path, parquet_path)
+
+class KlineFetchError(Exception):
+    """A kline window still failed after retries (so the result would have a hole)"""
+
 class BinanceDataCollector:
     BASE_URL = "https://api.binance.us/api/v3/klines"
     SYMBOL = "BTCUSDT"
     INTERVAL = "1m"
+    MAX_CONCURRENT = 6         # Parallel kline requests in async mode
+    WEIGHT_SOFT_CAP = 1000     # Back off when X-MBX-USED-WEIGHT(-1M) gets near the 1200/min limit
+    RETRY_STATUSES = (429, 500, 502, 503, 504)  # Same list as the Session's Retry
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.2        # Seconds, doubled per attempt (Retry-After wins when sent)
+    # Kline fields kept in the numeric buffer: open time, OHLC, volume, taker_buy_base
+    KLINE_FIELDS = [0, 1, 2, 3, 4, 5, 9]
     
-    def fetch_candles(self, start_time, end_time, limit=1000):
-        params = {
+    def __init__(self):
+        # Sequential fallback: one keep-alive session instead of a new TLS handshake per window
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504],
+                              raise_on_status=False)  # Non-200 still ends up as an empty window
+        ))
+    
+    def _params(self, start_time, end_time, limit=1000):
+        return {
             "symbol": self.SYMBOL,
             "interval": self.INTERVAL,
             "startTime": int(start_time.timestamp() * 1000),
             "endTime": int(end_time.timestamp() * 1000),
             "limit": limit
         }
-        resp = requests.get(self.BASE_URL, params=params, timeout=10)
+    
+    def fetch_candles(self, start_time, end_time, limit=1000):
+        resp = self.session.get(self.BASE_URL, params=self._params(start_time, end_time, limit), timeout=10)
         if resp.status_code == 200:
-            return resp.json()
+            return _json_loads(resp.content)
         return []
     
-    def fetch_historical_data(self, days=30):
-        all_candles = []
+    def _rows_to_array(self, candles):
+        """Raw kline rows -> float64 array of KLINE_FIELDS (ms timestamps are exact in float64)"""
+        if len(candles) == 0:
+            return np.empty((0, len(self.KLINE_FIELDS)))
+        return np.array(candles, dtype=object)[:, self.KLINE_FIELDS].astype(np.float64)
+    
+    async def _fetch_candles_async(self, session, sem, start_time, end_time):
+        """
+        One kline window. Retries 429/5xx and timeouts with exponential backoff
+        (like the sync Session's Retry) and raises once the retries run out.
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            delay = self.RETRY_BACKOFF * 2 ** attempt
+            try:
+                async with sem:
+                    async with session.get(self.BASE_URL, params=self._params(start_time, end_time)) as resp:
+                        resp.raise_for_status()
+                        candles = _json_loads(await resp.read())
+                        used = resp.headers.get('X-MBX-USED-WEIGHT-1M') or resp.headers.get('X-MBX-USED-WEIGHT')
+                        if used and int(used) > self.WEIGHT_SOFT_CAP:
+                            await asyncio.sleep(1)  # Hold the semaphore slot so the others slow down too
+                        return self._rows_to_array(candles)
+            except aiohttp.ClientResponseError as e:
+                if e.status not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                    raise
+                retry_after = (e.headers or {}).get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.MAX_RETRIES:
+                    raise
+            await asyncio.sleep(delay)  # Outside the semaphore so other windows keep going
+    
+    async def _fetch_windows_async(self, windows):
+        sem = asyncio.Semaphore(self.MAX_CONCURRENT)
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=16, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10)
+        ) as session:
+            results = await asyncio.gather(
+                *[self._fetch_candles_async(session, sem, s, e) for s, e in windows],
+                return_exceptions=True
+            )
+        # Let every window finish, then report failures instead of returning holes
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            raise KlineFetchError(f"{len(errors)} of {len(windows)} kline windows failed (first: {type(errors[0]).__name__}: {errors[0]})")
+        return results
+    
+    def fetch_historical_data(self, days=30, start_time=None):
+        """
+        Fetch the last `days` days of 1-min klines.
+        If start_time is given, only candles from then on are requested.
+        Returns a float64 array with one row per kline and KLINE_FIELDS columns
+        (see to_dataframe_from_buf). NOTE: this used to return the raw kline
+        rows (lists); to_dataframe accepts both, so
+        to_dataframe(fetch_historical_data()) still works.
+        """
         end_time = datetime.now(timezone.utc)
-        start_time = end_time - timedelta(days=days)
-        current_start = start_time
-        
-        print(f"📊 Fetching {days} days of BTC 1-min data...")
+        window_start = end_time - timedelta(days=days)
+        start_time = max(start_time, window_start) if start_time else window_start
         
-        request_count = 0
+        # 1000-minute windows (Binance's max klines per request)
+        windows = []
+        current_start = start_time
         while current_start < end_time:
             current_end = min(current_start + timedelta(minutes=1000), end_time)
-            candles = self.fetch_candles(current_start, current_end)
-            
-            if candles:
-                all_candles.extend(candles)
-                request_count += 1
-                if request_count % 10 == 0:
-                    print(f"   Fetched {len(all_candles):,} candles...")
-            
+            windows.append((current_start, current_end))
             current_start = current_end
-            time.sleep(0.1)
         
-        print(f"✅ Total candles: {len(all_candles):,}")
-        return all_candles
+        hours = (end_time - start_time).total_seconds() / 3600
+        span = f"{days} days" if start_time == window_start else f"{hours:.1f} hours"
+        print(f"📊 Fetching {span} of BTC 1-min data ({len(windows)} requests)...")
+        
+        # Preallocate for the most klines the windows can return; each chunk is
+        # converted to floats as it arrives and copied into its slice
+        capacity = sum(min(1000, int((e - s).total_seconds() // 60) + 1) for s, e in windows)
+        buf = np.empty((capacity, len(self.KLINE_FIELDS)))
+        n_filled = 0
+        
+        def append(chunk):
+            nonlocal n_filled
+            buf[n_filled:n_filled + len(chunk)] = chunk
+            n_filled += len(chunk)
+        
+        if aiohttp is not None:
+            # Concurrent, keep-alive requests; gather keeps the windows in order
+            for chunk in asyncio.run(self._fetch_windows_async(windows)):
+                append(chunk)
+        else:
+            for i, (s, e) in enumerate(windows, 1):
+                # The Session already retried 429/5xx; anything left is a hole
+                resp = self.session.get(self.BASE_URL, params=self._params(s, e), timeout=10)
+                if resp.status_code != 200:
+                    raise KlineFetchError(f"kline window {s:%Y-%m-%d %H:%M} failed (HTTP {resp.status_code})")
+                append(self._rows_to_array(_json_loads(resp.content)))
+                if i % 10 == 0:
+                    print(f"   Fetched {n_filled:,} candles...")
+                time.sleep(0.1)
+        
+        print(f"✅ Total candles: {n_filled:,}")
+        return buf[:n_filled]
     
     def to_dataframe(self, candles):
-        df = pd.DataFrame(candles, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].astype(float)
-        df.set_index('timestamp', inplace=True)
-        return df
+        """
+        Binance kline rows, or the numeric buffer from fetch_historical_data,
+        -> typed candle DataFrame (UTC DatetimeIndex).
+        Only the columns the bot/backtest read (CANDLE_COLUMNS) are kept.
+        """
+        if isinstance(candles, np.ndarray) and candles.dtype.kind == 'f':
+            return self.to_dataframe_from_buf(candles)
+        return self.to_dataframe_from_buf(self._rows_to_array(candles))
+    
+    def to_dataframe_from_buf(self, buf, n_filled=None):
+        """Numeric kline buffer (fetch_historical_data) -> typed candle DataFrame"""
+        rows = buf[:len(buf) if n_filled is None else n_filled]
+        index = pd.DatetimeIndex(pd.to_datetime(rows[:, 0].astype(np.int64), unit='ms', utc=True), name='timestamp')
+        return pd.DataFrame({
+            # Prices stay float64; volumes don't need the precision
+            'open': rows[:, 1], 'high': rows[:, 2],
+            'low': rows[:, 3], 'close': rows[:, 4],
+            'volume': rows[:, 5].astype(np.float32),
+            'taker_buy_base': rows[:, 6].astype(np.float32),
+        }, index=index)
 
 def main():
-    collector = BinanceDataCollector()
-    raw = collector.fetch_historical_data(days=30)
-    df = collector.to_dataframe(raw)
-    
-    # Ensure data directory exists
-    os.makedirs("data", exist_ok=True)
-    df.to_csv("data/btc_1min_data.csv")
-    print(f"💾 Saved data/btc_1min_data.csv ({len(df):,} rows)")
+    try:
+        df, path = update_candle_file(days=30)
+    except (KlineFetchError, requests.RequestException) as e:
+        print(f"❌ Download failed, candle file left unchanged: {e}")
+        return
+    print(f"💾 Saved {path} ({len(df):,} rows)")
 
 if __name__ == "__main__":
     main()
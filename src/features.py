@@ -5,74 +5,311 @@ Ensures consistency between Training and Live Trading
 
 import pandas as pd
 import numpy as np
+import math
+from bisect import bisect_left, insort
+from collections import deque
+from _njit import HAS_NUMBA
+from _wilder import WILDER_N, WILDER_ALPHA
 
-def add_technical_indicators(df):
+if HAS_NUMBA:
+    from _indicators_nb import compute_all, rolling_quantile, INDICATOR_COLUMNS
+
+def _rolling_sums(a, n):
+    """Window sums of (a - shift) and (a - shift)**2 via cumsum, plus the shift and a full-valid-window mask"""
+    valid = ~np.isnan(a)
+    shift = a[valid].mean() if valid.any() else 0.0  # Centre the sums to limit cancellation
+    x = np.where(valid, a - shift, 0.0)
+    cs = np.concatenate(([0.0], np.cumsum(x)))
+    cs2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    cnt = np.concatenate(([0], np.cumsum(valid)))
+    s = cs[n:] - cs[:-n]
+    s2 = cs2[n:] - cs2[:-n]
+    full = (cnt[n:] - cnt[:-n]) == n  # pandas rolling(n) needs n non-NaN values
+    return s, s2, shift, full
+
+def _rolling_mean(a, n):
+    """Same as Series.rolling(n).mean() on a float array, in one cumsum pass"""
+    out = np.full(len(a), np.nan)
+    if len(a) >= n:
+        s, _, shift, full = _rolling_sums(a, n)
+        out[n - 1:] = np.where(full, s / n + shift, np.nan)
+    return out
+
+def _rolling_std(a, n):
+    """Same as Series.rolling(n).std() (ddof=1) on a float array, from cumsums of x and x**2"""
+    out = np.full(len(a), np.nan)
+    if len(a) >= n:
+        s, s2, _, full = _rolling_sums(a, n)
+        var = np.maximum((s2 - s * s / n) / (n - 1), 0.0)
+        out[n - 1:] = np.where(full, np.sqrt(var), np.nan)
+    return out
+
+def add_technical_indicators_batch(df):
     """
-    Adds technical indicators to a DataFrame.
+    Adds technical indicators to a whole DataFrame (backtests, calibration).
+    Live bars go through LiveIndicatorStream instead.
     Expects columns: ['open', 'high', 'low', 'close', 'volume', 'taker_buy_base']
+    Indicators are computed in float64 and stored as float32 (half the bytes
+    for the backtest sweeps); the input columns are left untouched.
     """
-    df = df.copy()
+    n = len(df)
+    out = {}  # Column name -> preallocated float32 array, joined to df once at the end
+    
+    def put(col, values):
+        buf = out.get(col)
+        if buf is None:
+            buf = out[col] = np.empty(n, dtype=np.float32)
+        buf[:] = values
+    
+    if HAS_NUMBA and 'high' in df.columns and 'low' in df.columns:
+        # Fused single-pass kernels (same results as the pandas path below)
+        arrays = [df[c].to_numpy(dtype=np.float64) for c in ('close', 'high', 'low', 'volume', 'taker_buy_base')]
+        for col, values in zip(INDICATOR_COLUMNS, compute_all(*arrays)):
+            put(col, values)
+        return _join_indicators(df, out)
+    
+    close = df['close'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
     
     # Moving Averages (Relative to current price)
-    df['ma_5_rel'] = (df['close'] - df['close'].rolling(5).mean()) / df['close'].rolling(5).mean()
-    df['ma_15_rel'] = (df['close'] - df['close'].rolling(15).mean()) / df['close'].rolling(15).mean()
-    df['ma_30_rel'] = (df['close'] - df['close'].rolling(30).mean()) / df['close'].rolling(30).mean()
+    ma_rel = {}
+    for w in (5, 15, 30):
+        ma = _rolling_mean(close, w)
+        ma_rel[w] = (close - ma) / ma
+        put(f'ma_{w}_rel', ma_rel[w])
     
     # Momentum
-    df['return_5m'] = df['close'].pct_change(5)
-    df['return_15m'] = df['close'].pct_change(15)
+    return_5m = df['close'].pct_change(5).to_numpy()
+    return_15m = df['close'].pct_change(15).to_numpy()
+    put('return_5m', return_5m)
+    put('return_15m', return_15m)
     
     # Volatility
-    df['vol_15'] = df['close'].rolling(15).std() / df['close']
-    df['vol_60'] = df['close'].rolling(60).std() / df['close']
+    vol_15 = _rolling_std(close, 15) / close
+    put('vol_15', vol_15)
+    put('vol_60', _rolling_std(close, 60) / close)
     
     # ATR (Average True Range) - Better volatility measure
     if 'high' in df.columns and 'low' in df.columns:
-        true_range = df['high'] - df['low']
-        df['atr_14'] = true_range.rolling(14).mean() / df['close']
+        true_range = df['high'].to_numpy(dtype=np.float64) - df['low'].to_numpy(dtype=np.float64)
+        put('atr_14', _rolling_mean(true_range, 14) / close)
     else:
-        df['atr_14'] = df['vol_15']  # Fallback
+        put('atr_14', vol_15)  # Fallback
     
     # Volatility Regime Detection (1 = high vol, 0 = normal)
-    vol_75th = df['vol_15'].rolling(100, min_periods=20).quantile(0.75)
-    df['high_vol_regime'] = (df['vol_15'] > vol_75th).astype(float)
-    df['high_vol_regime'] = df['high_vol_regime'].fillna(0)
+    if HAS_NUMBA:
+        vol_75th = rolling_quantile(vol_15, 100, 0.75, 20)  # Exact, sorted-window kernel
+    else:
+        vol_75th = pd.Series(vol_15).rolling(100, min_periods=20).quantile(0.75).to_numpy()
+    put('high_vol_regime', vol_15 > vol_75th)  # NaN compares False -> 0
     
-    # RSI
-    delta = df['close'].diff()
     # RSI (Wilder's Smoothing - Matches TradingView)
     delta = df['close'].diff()
     gain = delta.where(delta > 0, 0)
     loss = -delta.where(delta < 0, 0)
     
     # Use alpha=1/14 which is equivalent to Wilder's N=14
-    avg_gain = gain.ewm(alpha=1/14, min_periods=14, adjust=False).mean()
-    avg_loss = loss.ewm(alpha=1/14, min_periods=14, adjust=False).mean()
+    avg_gain = gain.ewm(alpha=WILDER_ALPHA, min_periods=WILDER_N, adjust=False).mean()
+    avg_loss = loss.ewm(alpha=WILDER_ALPHA, min_periods=WILDER_N, adjust=False).mean()
     
     rs = avg_gain / avg_loss.replace(0, np.nan)
-    df['rsi_14'] = 100 - (100 / (1 + rs))
-    df['rsi_14'] = df['rsi_14'].fillna(50)
+    put('rsi_14', (100 - (100 / (1 + rs))).fillna(50).to_numpy())
     
     # Volume & Sentiment
-    df['vol_ratio'] = df['volume'] / df['volume'].rolling(20).mean()
-    df['taker_ratio'] = df['taker_buy_base'] / df['volume'].replace(0, np.nan)
-    df['taker_ratio'] = df['taker_ratio'].fillna(0.5)
+    put('vol_ratio', volume / _rolling_mean(volume, 20))
+    taker_ratio = df['taker_buy_base'] / df['volume'].replace(0, np.nan)
+    put('taker_ratio', taker_ratio.fillna(0.5).to_numpy())
     
     # Momentum Confluence (0 = bearish, 1 = bullish)
-    df['momentum_confluence'] = (
-        (df['return_5m'] > 0).astype(float) +
-        (df['return_15m'] > 0).astype(float) +
-        (df['ma_5_rel'] > 0).astype(float)
-    ) / 3
-    df['momentum_confluence'] = df['momentum_confluence'].fillna(0.5)
+    # Summed in place in the output buffer (NaN compares False, so no fill is needed)
+    put('momentum_confluence', return_5m > 0)
+    confluence = out['momentum_confluence']
+    confluence += return_15m > 0
+    confluence += ma_rel[5] > 0
+    confluence /= 3
     
+    return _join_indicators(df, out)
+
+def _join_indicators(df, out):
+    """Build the result frame in one step (no per-column inserts into a copy of df)"""
     # Time features
     if isinstance(df.index, pd.DatetimeIndex):
-        df['hour'] = df.index.hour
+        out['hour'] = df.index.hour.to_numpy()
     else:
-        df['hour'] = 0
+        out['hour'] = np.zeros(len(df), dtype=np.int32)
+    
+    return pd.concat([df, pd.DataFrame(out, index=df.index)], axis=1)
+
+class LiveIndicatorStream:
+    """
+    Streaming version of add_technical_indicators_batch for the live bot.
+    Keeps the last 60 closed bars plus running window sums and Wilder
+    RSI averages, so each new bar costs O(1) instead of a full recompute
+    (high_vol_regime keeps a sorted 100-bar vol_15 window, O(100) worst case).
+    Only the latest-row values are produced; 'hour' is added by the *_bar
+    methods when the bar carries a timestamp.
+    
+    IMPORTANT: Formulas mirror add_technical_indicators_batch. Keep them in lock-step.
+    """
+    WINDOWS = (5, 15, 30, 60)    # Close windows (MAs, vol_15/vol_60)
+    STD_WINDOWS = (15, 60)
+    RESYNC_EVERY = 1000          # Recompute running sums from scratch to stop float drift
+    
+    def __init__(self):
+        self.closes = deque(maxlen=60)
+        self.ranges = deque(maxlen=14)   # high - low, for atr_14
+        self.volumes = deque(maxlen=20)  # for vol_ratio
+        self.ref = None                  # Price offset for the sums (limits cancellation in the std)
+        self.sums = dict.fromkeys(self.WINDOWS, 0.0)
+        self.sumsq = dict.fromkeys(self.STD_WINDOWS, 0.0)
+        self.range_sum = 0.0
+        self.volume_sum = 0.0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.vol15_window = deque(maxlen=100)  # vol_15 of the closed bars (NaN included)
+        self.vol15_sorted = []                 # Non-NaN values of vol15_window, sorted
+        self.n_bars = 0
+        self.last = {}                   # Indicators as of the last closed bar
+    
+    def _next(self, close, high, low, volume):
+        """Running totals after appending one bar (does not mutate state)"""
+        closes = self.closes
+        n = len(closes)
+        ref = close if self.ref is None else self.ref
+        x = close - ref
+        
+        sums, sumsq = {}, {}
+        for w in self.WINDOWS:
+            drop = closes[-w] - ref if n >= w else 0.0
+            sums[w] = self.sums[w] + x - drop
+            if w in self.sumsq:
+                sumsq[w] = self.sumsq[w] + x * x - drop * drop
+        
+        rng = high - low
+        range_sum = self.range_sum + rng - (self.ranges[0] if len(self.ranges) == 14 else 0.0)
+        volume_sum = self.volume_sum + volume - (self.volumes[0] if len(self.volumes) == 20 else 0.0)
         
-    return df
+        # Wilder smoothing (ewm alpha=1/14, adjust=False); the first bar's diff counts as 0
+        d = close - closes[-1] if n else 0.0
+        avg_gain = self.avg_gain * (1 - WILDER_ALPHA) + WILDER_ALPHA * (d if d > 0 else 0.0)
+        avg_loss = self.avg_loss * (1 - WILDER_ALPHA) + WILDER_ALPHA * (-d if d < 0 else 0.0)
+        
+        return ref, sums, sumsq, range_sum, volume_sum, avg_gain, avg_loss
+    
+    def _values(self, close, volume, taker_buy_base, totals):
+        """Indicator dict for a bar given the totals from _next"""
+        ref, sums, sumsq, range_sum, volume_sum, avg_gain, avg_loss = totals
+        closes = self.closes
+        n = self.n_bars + 1  # Bars including this one
+        nan = float('nan')
+        
+        ma = {w: (sums[w] / w + ref if n >= w else nan) for w in (5, 15, 30)}
+        std = {}
+        for w in self.STD_WINDOWS:
+            if n >= w:
+                var = (sumsq[w] - sums[w] * sums[w] / w) / (w - 1)
+                std[w] = math.sqrt(max(var, 0.0))
+            else:
+                std[w] = nan
+        
+        return_5m = close / closes[-5] - 1 if n > 5 else nan
+        return_15m = close / closes[-15] - 1 if n > 15 else nan
+        ma_5_rel = (close - ma[5]) / ma[5]
+        vol_15 = std[15] / close
+        
+        if n < WILDER_N or avg_loss == 0:
+            rsi = 50.0
+        else:
+            rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+        
+        return {
+            'ma_5_rel': ma_5_rel,
+            'ma_15_rel': (close - ma[15]) / ma[15],
+            'ma_30_rel': (close - ma[30]) / ma[30],
+            'return_5m': return_5m,
+            'return_15m': return_15m,
+            'vol_15': vol_15,
+            'vol_60': std[60] / close,
+            'atr_14': range_sum / 14 / close if n >= 14 else nan,
+            'high_vol_regime': self._high_vol_regime(vol_15),
+            'rsi_14': rsi,
+            # The running sum can drift a hair below 0 between resyncs; batch gives NaN on an all-zero window
+            'vol_ratio': volume / (volume_sum / 20) if n >= 20 and volume_sum > 0 else nan,
+            'taker_ratio': taker_buy_base / volume if volume != 0 else 0.5,
+            'momentum_confluence': (float(return_5m > 0) + float(return_15m > 0) + float(ma_5_rel > 0)) / 3,
+            'close': close,
+        }
+    
+    def _vol15_sorted_after(self, vol_15):
+        """Sorted non-NaN vol_15 window after appending vol_15 (copies instead of mutating)"""
+        s = self.vol15_sorted
+        if len(self.vol15_window) == 100 and not math.isnan(self.vol15_window[0]):
+            s = s.copy()
+            del s[bisect_left(s, self.vol15_window[0])]
+        if not math.isnan(vol_15):
+            s = s.copy() if s is self.vol15_sorted else s
+            insort(s, vol_15)
+        return s
+    
+    def _high_vol_regime(self, vol_15):
+        """1.0 if vol_15 is above the rolling 100-bar 75th percentile (min 20 values), else 0.0"""
+        s = self._vol15_sorted_after(vol_15)
+        m = len(s)
+        if m < 20:
+            return 0.0
+        pos = 0.75 * (m - 1)
+        lo = int(pos)
+        hi = min(lo + 1, m - 1)
+        q75 = s[lo] + (s[hi] - s[lo]) * (pos - lo)
+        return 1.0 if vol_15 > q75 else 0.0
+    
+    def peek(self, close, high, low, volume, taker_buy_base):
+        """Indicators as if this (still open) bar were appended, without changing the state"""
+        totals = self._next(close, high, low, volume)
+        return self._values(close, volume, taker_buy_base, totals)
+    
+    def update(self, close, high, low, volume, taker_buy_base):
+        """Append a closed bar and return its indicators"""
+        totals = self._next(close, high, low, volume)
+        self.last = self._values(close, volume, taker_buy_base, totals)
+        self.vol15_sorted = self._vol15_sorted_after(self.last['vol_15'])
+        self.vol15_window.append(self.last['vol_15'])
+        self.ref, self.sums, self.sumsq, self.range_sum, self.volume_sum, self.avg_gain, self.avg_loss = totals
+        self.closes.append(close)
+        self.ranges.append(high - low)
+        self.volumes.append(volume)
+        self.n_bars += 1
+        if self.n_bars % self.RESYNC_EVERY == 0:
+            self._resync()
+        return self.last
+    
+    def peek_bar(self, bar):
+        """peek() for a candle dict (close/high/low/volume/taker_buy_base, optional timestamp)"""
+        out = self.peek(bar['close'], bar['high'], bar['low'], bar['volume'], bar['taker_buy_base'])
+        if 'timestamp' in bar:
+            out['hour'] = bar['timestamp'].hour
+        return out
+    
+    def update_bar(self, bar):
+        """update() for a candle dict (close/high/low/volume/taker_buy_base, optional timestamp)"""
+        out = self.update(bar['close'], bar['high'], bar['low'], bar['volume'], bar['taker_buy_base'])
+        if 'timestamp' in bar:
+            out['hour'] = bar['timestamp'].hour
+        return out
+    
+    def _resync(self):
+        closes = list(self.closes)
+        for w in self.WINDOWS:
+            tail = [c - self.ref for c in closes[-w:]]
+            self.sums[w] = sum(tail)
+            if w in self.sumsq:
+                self.sumsq[w] = sum(t * t for t in tail)
+        self.range_sum = sum(self.ranges)
+        self.volume_sum = sum(self.volumes)
+
+# Old names
+add_technical_indicators = add_technical_indicators_batch
+IndicatorState = LiveIndicatorStream
 
 # Updated feature list with new indicators
 FEATURE_COLS = [
@@ -81,3 +318,13 @@ FEATURE_COLS = [
     'vol_ratio', 'taker_ratio', 'momentum_confluence', 'hour', 
     'close', 'strike_offset', 'minutes_to_expiry'
 ]
+
+# One float32 field per feature, e.g. for a structured view of a feature matrix row
+FEATURE_DTYPE = np.dtype([(c, np.float32) for c in FEATURE_COLS])
+
+def to_feature_matrix(df, columns=FEATURE_COLS):
+    """
+    Contiguous (N, len(columns)) float32 matrix of the feature columns for model input.
+    strike_offset / minutes_to_expiry aren't indicators: add them to df first.
+    """
+    return np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
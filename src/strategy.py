@@ -4,15 +4,56 @@ Used by both bot_momentum.py (live trading) and backtest_momentum.py (simulation
 to ensure 100% logic parity.
 """
 
+import numpy as np
+
+# Signal codes returned by get_signals_array (0 = no trade), in get_signal priority order
+SIGNAL_NONE = 0
+SIGNAL_RSI80_DIP = 1
+SIGNAL_RSI75_DIP = 2
+SIGNAL_RSI65_DIP = 3
+SIGNAL_RSI30_OVERSOLD = 4
+SIGNAL_DROP_15M = 5
+
+# Signal code -> direction (+1 = YES, -1 = NO, 0 = no trade)
+SIGNAL_DIRECTION = np.array([0, -1, -1, -1, 1, 1], dtype=np.int8)
+
+# Signal code -> calibrate_win_rates() key and its default (backtest) win rate
+SIGNAL_RATE_KEYS = (None, 'rsi_80_confirm', 'rsi_75_confirm', 'rsi_65_confirm',
+                    'rsi_30_oversold', '15m_drop')
+DEFAULT_RATES = np.array([np.nan, 0.806, 0.777, 0.719, 0.666, 0.696])
+
+# Win rates get_signal reports, indexed by signal code (see set_calibration)
+_RATES = DEFAULT_RATES.copy()
+
+
+def _rates_table(calibrated_rates):
+    """Win-rate table for a signal_name -> win_rate dict (missing signals use the defaults)"""
+    rates = DEFAULT_RATES.copy()
+    for code, key in enumerate(SIGNAL_RATE_KEYS):
+        if key in calibrated_rates:
+            rates[code] = calibrated_rates[key]
+    return rates
+
+
+def set_calibration(calibrated_rates):
+    """
+    Load calibrated win rates (signal_name -> win_rate, as returned by
+    calibrate_win_rates) into the table get_signal reads from.
+    Signals missing from the dict fall back to their defaults.
+    """
+    _RATES[:] = _rates_table(calibrated_rates)
+
+
 def get_signal(indicators, calibrated_rates=None):
     """
     Generate trading signal based on OPTIMIZED high win-rate rules.
     Returns: (direction, signal_name, expected_win_rate) or None
     
-    Win rates can be passed in from recent backtest calibration.
+    Win rates come from the table loaded by set_calibration(). Passing
+    calibrated_rates uses those rates for this call only (building a table
+    per call, so prefer set_calibration on hot paths).
     """
-    if calibrated_rates is None:
-        calibrated_rates = {}
+    rates = _RATES if calibrated_rates is None else _rates_table(calibrated_rates)
         
     rsi = indicators.get('rsi_14', 50)
     return_15m = indicators.get('return_15m', 0)
@@ -29,19 +70,19 @@ def get_signal(indicators, calibrated_rates=None):
     # 1. THE GOLDEN SIGNAL: RSI > 80 + Dip (Red Candle)
     # Backtest WR: 80.6% (180 trades)
     if rsi > 80 and return_5m < 0:
-        wr = calibrated_rates.get('rsi_80_confirm', 0.806)
+        wr = float(rates[SIGNAL_RSI80_DIP])
         return ('NO', f'RSI={rsi:.0f}>80+DIP_GOLD', wr)
     
     # 2. RSI > 75 + Dip (High Confidence)
     # Backtest WR: 77.7% (373 trades)
     if rsi > 75 and return_5m < 0:
-        wr = calibrated_rates.get('rsi_75_confirm', 0.777)
+        wr = float(rates[SIGNAL_RSI75_DIP])
         return ('NO', f'RSI={rsi:.0f}>75+DIP', wr)
         
     # 3. RSI > 65 + Dip (Turbo Mode - Expanded)
     # Backtest WR: 71.9% (1242 trades - High Volume)
     if rsi > 65 and return_5m < 0:
-        wr = calibrated_rates.get('rsi_65_confirm', 0.719)
+        wr = float(rates[SIGNAL_RSI65_DIP])
         return ('NO', f'RSI={rsi:.0f}>65+DIP', wr)
     
     # === MEAN REVERSION SIGNALS (Bet YES) ===
@@ -49,16 +90,48 @@ def get_signal(indicators, calibrated_rates=None):
     # 4. RSI < 30 (Oversold Bounce)
     # Backtest WR: 66.6% (4544 trades - Massive Volume)
     if rsi < 30:
-        wr = calibrated_rates.get('rsi_30_oversold', 0.666)
+        wr = float(rates[SIGNAL_RSI30_OVERSOLD])
         return ('YES', f'RSI={rsi:.0f}<30_OVERSOLD', wr)
     
     # 5. Big Drop Mean Reversion (-0.3%)
     # Backtest WR: 69.6% (3072 trades)
     if return_15m < -0.003:
-        wr = calibrated_rates.get('15m_drop', 0.696)
+        wr = float(rates[SIGNAL_DROP_15M])
         return ('YES', f'15m_drop={return_15m*100:.2f}%', wr)
     
     # NOTE: "Big Pump Fade" signal removed (only ~65% WR, dragged down average)
     
     return None
 
+
+def get_signals_array(rsi_14, return_5m, return_15m):
+    """
+    Array version of get_signal() for backtests.
+    Takes equal-length NumPy arrays and returns an int8 array of SIGNAL_* codes,
+    i.e. which rule of get_signal would fire on each row.
+    
+    Rules (and their priority) MUST stay in sync with get_signal above.
+    """
+    # Compare in float64 like get_signal and the Numba kernel: against a float32
+    # column the thresholds would otherwise be rounded to float32 first
+    rsi_14, return_5m, return_15m = (np.asarray(a, dtype=np.float64) for a in (rsi_14, return_5m, return_15m))
+    dip = return_5m < 0
+    conditions = [
+        return_15m < -0.02,        # Crash protection -> no trade
+        (rsi_14 > 80) & dip,
+        (rsi_14 > 75) & dip,
+        (rsi_14 > 65) & dip,
+        rsi_14 < 30,               # Oversold bounce
+        return_15m < -0.003,       # 15m drop mean reversion
+    ]
+    codes = [SIGNAL_NONE, SIGNAL_RSI80_DIP, SIGNAL_RSI75_DIP, SIGNAL_RSI65_DIP,
+             SIGNAL_RSI30_OVERSOLD, SIGNAL_DROP_15M]
+    return np.select(conditions, codes, default=SIGNAL_NONE).astype(np.int8)
+
+
+def get_signal_vectorized(rsi_14, return_15m, return_5m):
+    """
+    Directions for get_signals_array(): int8 array of
+    +1 = YES, -1 = NO, 0 = no trade.
+    """
+    return SIGNAL_DIRECTION[get_signals_array(rsi_14, return_5m, return_15m)]
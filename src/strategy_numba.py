@@ -0,0 +1,79 @@
+"""
+Numba Kernel for the Shared Strategy
+Single-pass, allocation-free version of strategy.get_signal used by the backtest.
+
+IMPORTANT: The decision tree below is a copy of strategy.get_signal.
+Keep the two in lock-step (same thresholds, same priority order).
+"""
+
+import numpy as np
+from _njit import njit, HAS_NUMBA
+from strategy import get_signal_vectorized
+
+try:
+    # Ahead-of-time build of the kernel below (see _strategy_aot.py)
+    import momentum_kernels as _aot
+except ImportError:
+    _aot = None
+
+# (feature dtype, outcome dtype) -> AOT export name
+_AOT_EXPORTS = {
+    (np.dtype(np.float32), np.dtype(np.uint8)): 'signal_and_win_f4',
+    (np.dtype(np.float64), np.dtype(np.int64)): 'signal_and_win_f8',
+}
+
+
+@njit(cache=True)
+def _signal_and_win_nb(rsi, r15, r5, won_yes, won_no):
+    trades = 0
+    wins = 0
+    for i in range(rsi.shape[0]):
+        # Crash protection
+        if r15[i] < -0.02:
+            continue
+        # RSI 80 / 75 / 65 + Dip -> NO
+        if rsi[i] > 65 and r5[i] < 0:
+            trades += 1
+            wins += won_no[i]
+        # RSI < 30 or 15m drop -> YES
+        elif rsi[i] < 30 or r15[i] < -0.003:
+            trades += 1
+            wins += won_yes[i]
+    return trades, wins
+
+
+def signal_and_win(rsi, r15, r5, won_yes, won_no):
+    """
+    Count (trades, wins) the shared get_signal rules would produce over
+    whole arrays. Uses the AOT-compiled kernel when it was built for these
+    dtypes, then the Numba JIT kernel, otherwise the NumPy version from
+    strategy.py.
+    """
+    if _aot is not None and rsi.dtype == r15.dtype == r5.dtype and won_yes.dtype == won_no.dtype:
+        export = _AOT_EXPORTS.get((rsi.dtype, won_yes.dtype))
+        if export:
+            trades, wins = getattr(_aot, export)(
+                np.ascontiguousarray(rsi),
+                np.ascontiguousarray(r15),
+                np.ascontiguousarray(r5),
+                np.ascontiguousarray(won_yes),
+                np.ascontiguousarray(won_no),
+            )
+            return int(trades), int(wins)
+    
+    if HAS_NUMBA:
+        # Keep the callers' dtypes (float32/uint8 backtest columns compile their own specialization)
+        trades, wins = _signal_and_win_nb(
+            np.ascontiguousarray(rsi),
+            np.ascontiguousarray(r15),
+            np.ascontiguousarray(r5),
+            np.ascontiguousarray(won_yes),
+            np.ascontiguousarray(won_no),
+        )
+        return int(trades), int(wins)
+
+    dirs = get_signal_vectorized(rsi, r15, r5)
+    traded = dirs != 0
+    yes = dirs > 0
+    wins = ((yes & (won_yes != 0)) | (~yes & traded & (won_no != 0))).sum()
+    return int(traded.sum()), int(wins)
@@ -0,0 +1,127 @@
+"""
+Parity tests for the duplicated strategy / indicator implementations.
+
+The signal rules exist three times (strategy.get_signal, strategy.get_signals_array,
+strategy_numba.signal_and_win) and the indicators three times (pandas batch path,
+_indicators_nb.compute_all, features.LiveIndicatorStream). These fixed-seed
+checks keep the copies in lock-step.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import features  # noqa: E402
+import strategy  # noqa: E402
+import strategy_numba  # noqa: E402
+
+# get_signal name fragment -> get_signals_array code
+_NAME_CODES = (
+    ('>80+DIP', strategy.SIGNAL_RSI80_DIP),
+    ('>75+DIP', strategy.SIGNAL_RSI75_DIP),
+    ('>65+DIP', strategy.SIGNAL_RSI65_DIP),
+    ('<30_OVERSOLD', strategy.SIGNAL_RSI30_OVERSOLD),
+    ('15m_drop', strategy.SIGNAL_DROP_15M),
+)
+
+
+def _signal_inputs(n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    rsi = rng.uniform(0, 100, n)
+    # Put plenty of rows exactly on / next to the thresholds
+    rsi[::7] = rng.choice([30.0, 65.0, 75.0, 80.0], size=len(rsi[::7]))
+    r5 = rng.normal(0, 0.003, n)
+    r5[::11] = 0.0
+    r15 = rng.normal(0, 0.008, n)
+    r15[::13] = rng.choice([-0.02, -0.003], size=len(r15[::13]))
+    won_yes = rng.integers(0, 2, n)
+    return rsi, r5, r15, won_yes, 1 - won_yes
+
+
+def _scalar_codes(rsi, r5, r15):
+    codes = np.zeros(len(rsi), dtype=np.int8)
+    for i in range(len(rsi)):
+        result = strategy.get_signal({'rsi_14': rsi[i], 'return_5m': r5[i], 'return_15m': r15[i]})
+        if result:
+            codes[i] = next(code for frag, code in _NAME_CODES if frag in result[1])
+    return codes
+
+
+def test_get_signals_array_matches_get_signal():
+    rsi, r5, r15, _, _ = _signal_inputs()
+    np.testing.assert_array_equal(strategy.get_signals_array(rsi, r5, r15), _scalar_codes(rsi, r5, r15))
+
+
+@pytest.mark.parametrize('backend', ['default', 'jit', 'numpy'])
+@pytest.mark.parametrize('dtypes', [(np.float64, np.int64), (np.float32, np.uint8)])
+def test_signal_and_win_matches_signal_codes(monkeypatch, backend, dtypes):
+    rsi, r5, r15, won_yes, won_no = _signal_inputs()
+    ftype, otype = dtypes
+    rsi, r5, r15 = (a.astype(ftype) for a in (rsi, r5, r15))
+    won_yes, won_no = won_yes.astype(otype), won_no.astype(otype)
+
+    if backend != 'default':
+        monkeypatch.setattr(strategy_numba, '_aot', None)
+    if backend == 'numpy':
+        monkeypatch.setattr(strategy_numba, 'HAS_NUMBA', False)
+
+    directions = strategy.SIGNAL_DIRECTION[strategy.get_signals_array(rsi, r5, r15)]
+    expected_trades = int((directions != 0).sum())
+    expected_wins = int(won_yes[directions > 0].sum() + won_no[directions < 0].sum())
+    assert strategy_numba.signal_and_win(rsi, r15, r5, won_yes, won_no) == (expected_trades, expected_wins)
+
+
+def _candles(n=600, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 40000 * np.exp(np.cumsum(rng.normal(0, 0.0015, n)))
+    volume = rng.gamma(2, 5, n)
+    volume[50:53] = 0.0  # Zero-volume minutes (taker_ratio fallback)
+    return pd.DataFrame({
+        'open': close,
+        'high': close * (1 + np.abs(rng.normal(0, 0.0005, n))),
+        'low': close * (1 - np.abs(rng.normal(0, 0.0005, n))),
+        'close': close,
+        'volume': volume,
+        'taker_buy_base': volume * rng.uniform(0.2, 0.8, n),
+    }, index=pd.date_range('2024-01-01', periods=n, freq='min'))
+
+
+_INDICATORS = [
+    'ma_5_rel', 'ma_15_rel', 'ma_30_rel', 'return_5m', 'return_15m', 'vol_15', 'vol_60',
+    'atr_14', 'high_vol_regime', 'rsi_14', 'vol_ratio', 'taker_ratio', 'momentum_confluence',
+]
+
+
+def _assert_close(actual, expected, label):
+    # Batch columns are stored as float32
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-9, equal_nan=True, err_msg=label)
+
+
+def test_pandas_and_numba_batch_paths_agree(monkeypatch):
+    if not features.HAS_NUMBA:
+        pytest.skip('numba not installed')
+    df = _candles()
+    fused = features.add_technical_indicators_batch(df)
+    monkeypatch.setattr(features, 'HAS_NUMBA', False)
+    plain = features.add_technical_indicators_batch(df)
+    assert list(fused.columns) == list(plain.columns)
+    for col in _INDICATORS + ['hour']:
+        _assert_close(fused[col].to_numpy(np.float64), plain[col].to_numpy(np.float64), col)
+
+
+def test_live_stream_matches_batch():
+    df = _candles()
+    batch = features.add_technical_indicators_batch(df)
+    stream = features.LiveIndicatorStream()
+    rows = []
+    for ts, bar in zip(df.index, df.to_dict('records')):
+        bar['timestamp'] = ts
+        rows.append(stream.update_bar(bar))
+    live = pd.DataFrame(rows, index=df.index)
+    for col in _INDICATORS + ['hour']:
+        _assert_close(live[col].to_numpy(np.float64), batch[col].to_numpy(np.float64), col)
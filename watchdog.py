@@ -3,6 +3,7 @@ import subprocess
 import os
 import sys
 import signal
+import selectors
 from datetime import datetime
 
 # Configuration
@@ -17,6 +18,16 @@ BOTS = [
 
 processes = {}
 
+# The main loop sleeps in selector.select(): it wakes when a bot process exits
+# (its pidfd becomes readable) or when a log could next go stale, instead of
+# polling every minute.
+selector = selectors.DefaultSelector()
+pidfds = {}
+started_at = {}
+last_mtimes = {}  # log_file -> mtime seen by the previous check_staleness
+FALLBACK_POLL_SECONDS = 60  # Exit checks without pidfd support (non-Linux)
+RESTART_BACKOFF_SECONDS = 10  # Min time between starts, so a bot crashing on startup doesn't spin
+
 def log(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] [WATCHDOG] {message}")
@@ -30,16 +41,44 @@ def start_bot(bot_config):
     
     # Open logs for stdout/stderr redirection if needed, 
     # but for now we let them print to console so user sees what's happening
-    # We use preexec_fn=os.setsid to allow killing the whole process group if needed
+    # start_new_session puts the bot in its own process group so kill_bot can stop
+    # it together with any children (same as preexec_fn=os.setsid, without the
+    # fork-time Python callback)
     p = subprocess.Popen(
         [sys.executable, script],
         cwd=os.getcwd(),
+        start_new_session=True,
         # stdout=subprocess.PIPE, # Keep output in terminal for user to see
         # stderr=subprocess.PIPE
     )
     processes[name] = p
+    started_at[name] = time.time()
+    
+    # pidfd_open needs Linux 5.3+ / Python 3.9+; elsewhere exits are found by polling
+    try:
+        pidfds[name] = os.pidfd_open(p.pid)
+        selector.register(pidfds[name], selectors.EVENT_READ, bot_config)
+    except (AttributeError, OSError):
+        pass
     return p
 
+def forget_bot(name):
+    """Drop a stopped bot's process handle and pidfd"""
+    fd = pidfds.pop(name, None)
+    if fd is not None:
+        selector.unregister(fd)
+        os.close(fd)
+    del processes[name]
+
+def signal_bot(p, sig):
+    """Send sig to the bot's whole process group (just the process where there are no groups)"""
+    if hasattr(os, "killpg"):
+        os.killpg(p.pid, sig)
+    elif sig == signal.SIGTERM:
+        p.terminate()
+    else:
+        p.kill()
+
 def kill_bot(name):
     """Kill a bot process"""
     if name in processes:
@@ -47,27 +86,37 @@ def kill_bot(name):
         log(f"Killing {name} (PID: {p.pid})...")
         try:
             # Try gentle kill first
-            p.terminate()
+            signal_bot(p, signal.SIGTERM)
             try:
                 p.wait(timeout=5)
             except subprocess.TimeoutExpired:
                 # Force kill if stuck
                 log(f"{name} stuck, force killing...")
-                p.kill()
+                signal_bot(p, getattr(signal, "SIGKILL", signal.SIGTERM))
+                p.wait()
         except Exception as e:
             log(f"Error killing {name}: {e}")
-        del processes[name]
+        forget_bot(name)
 
 def check_staleness(bot_config):
     """Check if bot log is stale"""
     log_file = bot_config["log_file"]
     limit = bot_config["timeout_seconds"]
     
-    if not os.path.exists(log_file):
+    try:
+        mtime = os.stat(log_file).st_mtime
+    except FileNotFoundError:
         # If log doesn't exist yet, that's okay, maybe it's starting
         return False
+    
+    # Only a log that hasn't moved since the previous check is a freeze;
+    # a changed mtime means the bot is making (maybe slow) progress
+    prev_mtime = last_mtimes.get(log_file)
+    last_mtimes[log_file] = mtime
+    if prev_mtime is not None and mtime != prev_mtime:
+        return False
         
-    last_mod = os.path.getmtime(log_file)
+    last_mod = max(mtime, started_at.get(bot_config["name"], 0))
     age = time.time() - last_mod
     
     if age > limit:
@@ -76,6 +125,17 @@ def check_staleness(bot_config):
     
     return False
 
+def seconds_until_stale(bot_config):
+    """Time until the bot's log could exceed its staleness limit"""
+    limit = bot_config["timeout_seconds"]
+    try:
+        last_mod = os.stat(bot_config["log_file"]).st_mtime
+    except OSError:
+        return limit  # No log yet, give it a full timeout
+    # A freshly (re)started bot gets a full timeout before its log counts as stale
+    last_mod = max(last_mod, started_at.get(bot_config["name"], 0))
+    return max(limit - (time.time() - last_mod), 1)
+
 def main():
     log("Starting Watchdog... Press Ctrl+C to stop.")
     
@@ -85,7 +145,11 @@ def main():
     
     try:
         while True:
-            time.sleep(60)  # Check every minute
+            # Sleep until a bot exits or a log could go stale
+            timeout = min(seconds_until_stale(bot) for bot in BOTS)
+            if len(pidfds) < len(processes):
+                timeout = min(timeout, FALLBACK_POLL_SECONDS)
+            selector.select(timeout)
             
             for bot in BOTS:
                 name = bot["name"]
@@ -94,7 +158,8 @@ def main():
                 if name in processes:
                     if processes[name].poll() is not None:
                         log(f"⚠️ {name} has CRASHED (Exit Code: {processes[name].poll()}). Restarting...")
-                        del processes[name]
+                        forget_bot(name)
+                        time.sleep(max(0, started_at[name] + RESTART_BACKOFF_SECONDS - time.time()))
                         start_bot(bot)
                         continue
                 else: